@@ -1,29 +1,16 @@
-import os
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import json
+from name_store import LazyNameStore
+from name_variants import load_variant_index
 
 def load_name_data(folder_path):
-    data = {}
-    for year in range(1900, 2023+1):
-        file_path = os.path.join(folder_path, f'yob{year}.txt')
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path, names=['name', 'gender', 'count'])
-            data[year] = df
-    return data
-
-def get_name_counts(name, data, start_year):
-    counts = []
-    for year in range(start_year, 2023+1):
-        if year in data:
-            count = data[year][data[year]['name'] == name]['count'].sum()
-            counts.append(count)
-        else:
-            counts.append(0)
-    return counts
+    return LazyNameStore(folder_path, 1900, 2023)
+
+def get_name_counts(name, data, start_year, variant_index=None):
+    return data.get_counts_many([name], start_year, 2023, variant_index=variant_index)[0].tolist()
 
-def plot_individual_graphs(all_shows, name_data, selected_shows=None, show_dotted=False):
+def plot_individual_graphs(all_shows, name_data, selected_shows=None, show_dotted=False, variant_index=None):
     fig, axs = plt.subplots(5, 2, figsize=(8.3, 11.7))
     axs = axs.flatten()
     colors = ['red', 'darkorange', 'green', 'royalblue', 'navy', 'purple']
@@ -35,10 +22,11 @@ def plot_individual_graphs(all_shows, name_data, selected_shows=None, show_dotte
         start_year = 1970 if show['tv_show_name'] == "Friends" else 1990
         ax = axs[i]
 
-        for j, character in enumerate(show['characters']):
-            first_name = character.split()[0]
-            counts = get_name_counts(first_name, name_data, start_year)
-            counts = [max(c, 1) for c in counts]
+        first_names = [character.split()[0] for character in show['characters']]
+        show_counts = np.maximum(name_data.get_counts_many(first_names, start_year, 2023, variant_index=variant_index), 1)
+
+        for j, first_name in enumerate(first_names):
+            counts = show_counts[j]
 
             release_year = show['release_year']
             pre_release_counts = counts[:release_year - start_year + 1]
@@ -66,7 +54,7 @@ def plot_individual_graphs(all_shows, name_data, selected_shows=None, show_dotte
     plt.savefig("individual_tv_shows_A4_grid.pdf")
     plt.show()
 
-def plot_average_popularity(all_shows, name_data, file_name, selected_shows=None, show_dotted=True):
+def plot_average_popularity(all_shows, name_data, file_name, selected_shows=None, show_dotted=True, variant_index=None):
     plt.figure(figsize=(8, 4))
     colors = ['blue', 'red', 'green', 'orange', 'purple', 'cyan', 'magenta', 'yellow', 'brown', 'palevioletred']
 
@@ -79,14 +67,10 @@ def plot_average_popularity(all_shows, name_data, file_name, selected_shows=None
             continue
 
         start_year = 1990
-        show_counts = []
+        first_names = [character.split()[0] for character in show['characters']]
+        show_counts = name_data.get_counts_many(first_names, start_year, 2023, variant_index=variant_index)
 
-        for character in show['characters']:
-            first_name = character.split()[0]
-            counts = get_name_counts(first_name, name_data, start_year)
-            show_counts.append(counts)
-
-        show_average = np.mean(show_counts, axis=0) if show_counts else np.zeros(len(range(start_year, 2023+1)))
+        show_average = show_counts.mean(axis=0) if len(show_counts) else np.zeros(len(range(start_year, 2023+1)))
         all_show_averages.append(show_average)
 
         release_year = show['release_year']
@@ -123,12 +107,12 @@ def plot_average_popularity(all_shows, name_data, file_name, selected_shows=None
     plt.show()
 
 def main_plot(all_shows, name_data, file_name, plot_averages=False, plot_individuals=False, selected_shows=None,
-              selected_names=None, show_dotted=False):
+              selected_names=None, show_dotted=False, variant_index=None):
     if plot_individuals:
-        plot_individual_graphs(all_shows, name_data, selected_shows, show_dotted)
+        plot_individual_graphs(all_shows, name_data, selected_shows, show_dotted, variant_index)
 
     if plot_averages:
-        plot_average_popularity(all_shows, name_data, file_name, selected_shows)
+        plot_average_popularity(all_shows, name_data, file_name, selected_shows, variant_index=variant_index)
 
 if __name__ == "__main__":
     folder_path = r'C:\Users\ybars\OneDrive - huji.ac.il\HUJI Documents Shana BET\MATAR Bet\Data Mining 47717\babynames text files'
@@ -143,5 +127,12 @@ if __name__ == "__main__":
 
     file_name = "line_graph_A4_vertical.pdf"
 
-    main_plot(all_shows, name_data, file_name, plot_averages=True, plot_individuals=True, show_dotted=True)
-    main_plot(all_shows, name_data, file_name, plot_averages=True, plot_individuals=False)  # For average graph
+    # count spelling variants (Arya/Aria, Jon/John) together with the character's first name
+    merge_spelling_variants = False
+    variant_index = load_variant_index(folder_path) if merge_spelling_variants else None
+
+    main_plot(all_shows, name_data, file_name, plot_averages=True, plot_individuals=True, show_dotted=True,
+              variant_index=variant_index)
+    main_plot(all_shows, name_data, file_name, plot_averages=True, plot_individuals=False,
+              variant_index=variant_index)  # For average graph
+    print(f"Years loaded: {name_data.touched_summary()}")
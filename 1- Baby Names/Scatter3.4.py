@@ -1,70 +1,54 @@
 import os
-import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
 import json
+from name_store import LazyNameStore
+from name_variants import load_variant_index
 
 def load_name_data(folder_path):
-    data = {}
-    for year in range(1970, 2024):
-        file_path = os.path.join(folder_path, f'yob{year}.txt')
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path, names=['name', 'gender', 'count'])
-            data[year] = df
-    return data
-
-def get_name_counts(name, data, start_year):
-    counts = []
-    for year in range(start_year, 2024):
-        if year in data:
-            count = data[year][data[year]['name'] == name]['count'].sum()
-            counts.append(count)
-        else:
-            counts.append(0)
-    return counts
-
-def get_percentage_jump(name, data, debut_year):
-    debut_count = get_name_counts(name, data, debut_year)[0]
-    counts_after_debut = get_name_counts(name, data, debut_year)[1:8]
-    avg_counts_after_debut = sum(counts_after_debut) / len(counts_after_debut) if counts_after_debut else 0
-    if debut_count > 0:
-        percentage_jump = ((avg_counts_after_debut - debut_count) / debut_count) * 100
-        return percentage_jump
-    else:
-        return 0
-
-def calculate_show_metrics(all_shows, name_data):
+    return LazyNameStore(folder_path, 1970, 2023)
+
+def get_name_counts(name, data, start_year, variant_index=None):
+    return data.get_counts_many([name], start_year, 2023, variant_index=variant_index)[0].tolist()
+
+def get_debut_window_counts(names, data, debut_year, variant_index=None):
+    # debut year plus up to 7 years after it, one row per name
+    return data.get_counts_many(names, debut_year, min(debut_year + 7, 2023), variant_index=variant_index)
+
+def average_after_debut(window_counts):
+    if window_counts.shape[1] < 2:
+        return np.zeros(len(window_counts))
+    return window_counts[:, 1:8].mean(axis=1)
+
+def get_percentage_jumps(window_counts):
+    debut_counts = window_counts[:, 0]
+    avg_counts_after_debut = average_after_debut(window_counts)
+    jumps = np.zeros(len(window_counts))
+    positive = debut_counts > 0
+    jumps[positive] = (avg_counts_after_debut[positive] - debut_counts[positive]) / debut_counts[positive] * 100
+    return jumps
+
+def get_percentage_jump(name, data, debut_year, variant_index=None):
+    return float(get_percentage_jumps(get_debut_window_counts([name], data, debut_year, variant_index))[0])
+
+def calculate_show_metrics(all_shows, name_data, variant_index=None):
     show_metrics = {}
-    colors = ['blue', 'red', 'green', 'orange', 'purple', 'cyan', 'magenta', 'yellow', 'brown', 'palevioletred']
-    for i, show in enumerate(all_shows):
+    for show in all_shows:
         debut_year = show['release_year']
         show_name = show['tv_show_name']
-        percentage_jumps = []
-        debut_counts = []
-        total_debut_count = 0
-        total_avg_count_after = 0
-        for character in show['characters']:
-            first_name = character.split()[0]
-            debut_count = get_name_counts(first_name, name_data, debut_year)[0]
-            percentage_jump = get_percentage_jump(first_name, name_data, debut_year)
-            counts_after_debut = get_name_counts(first_name, data=name_data, start_year=debut_year)[1:8]
-            avg_count_after_debut = sum(counts_after_debut) / len(counts_after_debut) if counts_after_debut else 0
-            if debut_count > 0:
-                percentage_jumps.append(percentage_jump)
-                debut_counts.append(debut_count)
-                total_debut_count += debut_count
-                total_avg_count_after += avg_count_after_debut
-        if percentage_jumps:
-            avg_percentage_jump = sum(percentage_jumps) / len(percentage_jumps)
-            if total_debut_count > 0:
-                total_percentage_change = ((total_avg_count_after - total_debut_count) / total_debut_count) * 100
-            else:
-                total_percentage_change = 0
-            
+        first_names = [character.split()[0] for character in show['characters']]
+        window_counts = get_debut_window_counts(first_names, name_data, debut_year, variant_index)
+        debut_counts = window_counts[:, 0]
+        mask = debut_counts > 0
+        if mask.any():
+            avg_percentage_jump = float(get_percentage_jumps(window_counts)[mask].mean())
+            total_debut_count = debut_counts[mask].sum()
+            total_avg_count_after = average_after_debut(window_counts)[mask].sum()
+            total_percentage_change = float((total_avg_count_after - total_debut_count) / total_debut_count * 100)
             show_metrics[show_name] = {
                 'Average Percentage Jump': avg_percentage_jump,
                 'Total Percentage Change/Weighted Average Percentage Jump': total_percentage_change,
-                'Number of Names': len(percentage_jumps)
+                'Number of Names': int(mask.sum())
             }
         else:
             show_metrics[show_name] = {
@@ -74,9 +58,9 @@ def calculate_show_metrics(all_shows, name_data):
             }
     return show_metrics
 
-def scatter_plot_linear_regression(all_shows, name_data, show_metrics):
+def scatter_plot_linear_regression(all_shows, name_data, show_metrics, variant_index=None):
     debut_popularities = []
-    percentage_jumps = []
+    jumps = []
     name_labels = []
     show_colors = []
     colors = ['blue', 'red', 'green', 'orange', 'purple', 'cyan', 'magenta', 'yellow', 'brown', 'palevioletred']
@@ -86,16 +70,14 @@ def scatter_plot_linear_regression(all_shows, name_data, show_metrics):
         show_name = show['tv_show_name']
         show_color = colors[i % len(colors)]
         show_name_to_color[show_name] = show_color
-        for character in show['characters']:
-            first_name = character.split()[0]
-            debut_count = get_name_counts(first_name, name_data, debut_year)[0]
-            percentage_jump = get_percentage_jump(first_name, name_data, debut_year)
-            debut_popularities.append(debut_count)
-            percentage_jumps.append(percentage_jump)
-            name_labels.append(first_name)
-            show_colors.append(show_color)
-    debut_popularities = np.array(debut_popularities)
-    percentage_jumps = np.array(percentage_jumps)
+        first_names = [character.split()[0] for character in show['characters']]
+        window_counts = get_debut_window_counts(first_names, name_data, debut_year, variant_index)
+        debut_popularities.append(window_counts[:, 0])
+        jumps.append(get_percentage_jumps(window_counts))
+        name_labels.extend(first_names)
+        show_colors.extend([show_color] * len(first_names))
+    debut_popularities = np.concatenate(debut_popularities) if debut_popularities else np.array([])
+    percentage_jumps = np.concatenate(jumps) if jumps else np.array([])
     name_labels = np.array(name_labels)
     show_colors = np.array(show_colors)
     mask = (debut_popularities > 0) & (percentage_jumps != 0)
@@ -154,8 +136,12 @@ def load_shows_from_file(file_path):
 shows_file_path = r'C:\Users\ybars\PycharmProjects\datamining\DM_Names_new_approach\output\tv_shows_new_release.json'
 all_shows = load_shows_from_file(shows_file_path)
 
-show_metrics = calculate_show_metrics(all_shows, name_data)
-scatter_plot_linear_regression(all_shows, name_data, show_metrics)
+# count spelling variants (Arya/Aria, Jon/John) together with the character's first name
+merge_spelling_variants = False
+variant_index = load_variant_index(folder_path) if merge_spelling_variants else None
+
+show_metrics = calculate_show_metrics(all_shows, name_data, variant_index)
+scatter_plot_linear_regression(all_shows, name_data, show_metrics, variant_index)
 
 for show_name, metrics in show_metrics.items():
     print(f"Show: {show_name}")
@@ -163,3 +149,5 @@ for show_name, metrics in show_metrics.items():
     print(f"  Total Percentage Change/Weighted Average Percentage Jump: {metrics['Total Percentage Change/Weighted Average Percentage Jump']}")
     print(f"  Number of Names Analyzed: {metrics['Number of Names']}\n")
 
+print(f"Years loaded: {name_data.touched_summary()}")
+
@@ -1,13 +1,19 @@
 # newest scraper that does both characters and the release date!
 # saves to "tv_shows_new_release.json"
-import requests
-from bs4 import BeautifulSoup
+# set ASYNC_MODE to page through the search results and fetch the show pages concurrently
+# (IMDB_BASE_URL can point at scraping/stub_server.py to run against saved pages)
+# pages are kept in the shared response cache, so a re-run only downloads what changed (see scraping/http_cache.py)
 import json
 import os
-import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.http_cache import cached_get
+from scraping.parsers import make_soup
 
 ## GLOBAL VARS ##
-MAIN_URL = "https://www.imdb.com/search/title/?title_type=tv_series&sort=num_votes,desc"
+IMDB_BASE_URL = os.environ.get('IMDB_BASE_URL', 'https://www.imdb.com')
+MAIN_URL = f"{IMDB_BASE_URL}/search/title/?title_type=tv_series&sort=num_votes,desc"
 headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
     'Accept-Language': 'en-US,en;q=0.5'
@@ -16,33 +22,29 @@ headers = {
 num_of_shows = 10
 num_of_chars = 6
 
+## ASYNC MODE ##
+ASYNC_MODE = False
+PAGE_SIZE = 50          # shows per search results page
+MAX_PAGES = 100         # stop paging here when num_of_shows is None (all shows)
+RATE_LIMIT = 2.0        # requests per second, shared by every concurrent request
+BURST = 4
+MAX_CONCURRENCY = 8
+FULL_CAST = False       # take the characters from the full credits page instead of the top cast
 
-def get_tv_show_links():
-    print("Fetching the main page...")
-    response = requests.get(MAIN_URL, headers=headers)
-    if response.status_code == 403:
-        print("Access forbidden, please check your headers or proxy settings.")
-        return []
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+def parse_tv_show_links(html):
+    soup = make_soup(html)
     tv_show_links = []
 
     for a_tag in soup.find_all('a', class_='ipc-title-link-wrapper'):
         if 'href' in a_tag.attrs:
-            tv_show_links.append('https://www.imdb.com' + a_tag['href'])
-
-    print(f"Found {len(tv_show_links)} TV show links.")
-    return tv_show_links[:num_of_shows]
+            tv_show_links.append(IMDB_BASE_URL + a_tag['href'])
 
+    return tv_show_links
 
-def get_tv_show_info(tv_show_url):
-    print(f"Fetching info from {tv_show_url}...")
-    response = requests.get(tv_show_url, headers=headers)
-    if response.status_code == 403:
-        print("Access forbidden, please check your headers or proxy settings.")
-        return None, None, None
 
-    soup = BeautifulSoup(response.text, 'html.parser')
+def parse_tv_show_info(html, max_chars=num_of_chars):
+    soup = make_soup(html)
 
     # Get TV show name
     title_tag = soup.find('span', class_='hero__primary-text')
@@ -61,21 +63,120 @@ def get_tv_show_info(tv_show_url):
             character_name = character_list.find('span', class_='sc-bfec09a1-4 iZBIdd')
             if character_name:
                 characters.append(character_name.text)
-            if len(characters) >= num_of_chars:
+            if max_chars is not None and len(characters) >= max_chars:
                 break
 
+    return tv_show_name, int(release_year) if release_year else None, characters
+
+
+def parse_full_cast(html):
+    # characters column of the cast table on the /fullcredits page
+    soup = make_soup(html)
+    characters = []
+    for td in soup.select('table.cast_list td.character'):
+        character_name = ' '.join(td.get_text(' ', strip=True).split())
+        if character_name:
+            characters.append(character_name)
+    return characters
+
+
+def get_tv_show_links():
+    print("Fetching the main page...")
+    response = cached_get(MAIN_URL, headers=headers)
+    if response.status_code == 403:
+        print("Access forbidden, please check your headers or proxy settings.")
+        return []
+
+    if response.text is None:
+        print(f"No search results page (status {response.status_code})")
+        return []
+    tv_show_links = parse_tv_show_links(response.text)
+
+    print(f"Found {len(tv_show_links)} TV show links.")
+    return tv_show_links[:num_of_shows]
+
+
+def get_tv_show_info(tv_show_url, delay=0):
+    print(f"Fetching info from {tv_show_url}...")
+    response = cached_get(tv_show_url, headers=headers, delay=delay)
+    if response.status_code == 403:
+        print("Access forbidden, please check your headers or proxy settings.")
+        return None, None, None
+    if response.text is None:
+        print(f"No page for {tv_show_url} (status {response.status_code})")
+        return None, None, None
+
+    tv_show_name, release_year, characters = parse_tv_show_info(response.text)
+
     print(f"Found TV show: {tv_show_name}, Release year: {release_year}, Characters: {len(characters)}")
-    return tv_show_name, int(release_year), characters
+    return tv_show_name, release_year, characters
 
 
-def main():
-    tv_show_links = get_tv_show_links()
+def fetch_pages(urls):
+    # imported here so the synchronous mode runs without aiohttp installed
+    from scraping.async_fetch import fetch_many
+    return fetch_many(urls, rate=RATE_LIMIT, burst=BURST, concurrency=MAX_CONCURRENCY, headers=headers)
+
+
+def get_tv_show_links_async():
+    # search result pages are fetched a batch at a time until we have enough shows or a page comes back empty
+    tv_show_links = []
+    seen = set()
+    page = 0
+    while page < MAX_PAGES and (num_of_shows is None or len(tv_show_links) < num_of_shows):
+        if num_of_shows is None:
+            batch = MAX_CONCURRENCY
+        else:
+            batch = -(-(num_of_shows - len(tv_show_links)) // PAGE_SIZE)
+        batch = min(batch, MAX_PAGES - page)
+        urls = [f"{MAIN_URL}&start={1 + PAGE_SIZE * p}&count={PAGE_SIZE}" for p in range(page, page + batch)]
+        print(f"Fetching search result pages {page + 1}-{page + batch}...")
+        pages = fetch_pages(urls)
+        found = 0
+        repeated = False
+        for url in urls:
+            status, html = pages[url]
+            if html is None:
+                print(f"Failed to fetch {url} (status {status})")
+                continue
+            links = parse_tv_show_links(html)
+            found += len(links)
+            new_links = [link for link in dict.fromkeys(links) if link not in seen]
+            seen.update(new_links)
+            tv_show_links.extend(new_links)
+            repeated |= bool(links) and not new_links
+        page += batch
+        # a short page means the search results ran out, and a page with no new show means the site
+        # ignored start= and served the same results again
+        if found < PAGE_SIZE * batch or repeated:
+            break
+
+    print(f"Found {len(tv_show_links)} TV show links.")
+    return tv_show_links[:num_of_shows]
+
+
+def full_credits_url(tv_show_url):
+    return tv_show_url.split('?')[0].rstrip('/') + '/fullcredits'
+
+
+def scrape_async():
+    tv_show_links = get_tv_show_links_async()
+    print(f"Fetching {len(tv_show_links)} TV show pages...")
+    pages = fetch_pages(tv_show_links)
+    credits = fetch_pages([full_credits_url(url) for url in tv_show_links]) if FULL_CAST else {}
 
     tv_show_data = []
     for idx, tv_show_url in enumerate(tv_show_links):
-        tv_show_name, release_year, characters = get_tv_show_info(tv_show_url)
+        status, html = pages[tv_show_url]
+        if html is None:
+            print(f"Failed to retrieve the info for TV show {idx + 1} (status {status})")
+            continue
+        tv_show_name, release_year, characters = parse_tv_show_info(html, num_of_chars)
+        if FULL_CAST:
+            _, credits_html = credits[full_credits_url(tv_show_url)]
+            if credits_html is not None:
+                characters = parse_full_cast(credits_html)[:num_of_chars]
         if tv_show_name:
-            print(f"Processing TV show {idx + 1}/{num_of_shows}: {tv_show_name}")
             tv_show_data.append({
                 'tv_show_name': tv_show_name,
                 'characters': characters,
@@ -83,7 +184,28 @@ def main():
             })
         else:
             print(f"Failed to retrieve the info for TV show {idx + 1}")
-        time.sleep(2)  # Delay to avoid being blocked
+    return tv_show_data
+
+
+def main():
+    if ASYNC_MODE:
+        tv_show_data = scrape_async()
+    else:
+        tv_show_links = get_tv_show_links()
+
+        tv_show_data = []
+        for idx, tv_show_url in enumerate(tv_show_links):
+            # Delay to avoid being blocked, skipped for pages that come from the cache
+            tv_show_name, release_year, characters = get_tv_show_info(tv_show_url, delay=2 if idx else 0)
+            if tv_show_name:
+                print(f"Processing TV show {idx + 1}/{num_of_shows}: {tv_show_name}")
+                tv_show_data.append({
+                    'tv_show_name': tv_show_name,
+                    'characters': characters,
+                    'release_year': release_year
+                })
+            else:
+                print(f"Failed to retrieve the info for TV show {idx + 1}")
 
     # Create output directory if it doesn't exist
     os.makedirs('output', exist_ok=True)
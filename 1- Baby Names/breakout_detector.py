@@ -0,0 +1,113 @@
+# breakout detector: the Scatter3.4 percentage jump (7-year average after year Y vs the count in year Y)
+# computed for every name in the corpus at every candidate year, ranked by the biggest spikes
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from name_store import GENDERS, load_name_store
+
+WINDOW = 7
+
+_worker_store = None
+
+
+def collapse_gender(counts, gender=None):
+    # (names, years, 2) -> (names, years) for one gender channel or both summed
+    if gender is None:
+        return counts.sum(axis=2, dtype=np.int64)
+    return counts[:, :, GENDERS.index(gender)].astype(np.int64)
+
+
+def jump_matrix(counts, window=WINDOW):
+    # counts is (names, years); column t of the result scores year t against the mean of years t+1..t+window,
+    # so only years with a full window after them are returned (years - window columns)
+    # zero-count years have no defined jump and come back as nan
+    n_names, n_years = counts.shape
+    if n_years <= window:
+        return np.full((n_names, 0), np.nan)
+    cumsum = np.zeros((n_names, n_years + 1), dtype=np.int64)
+    np.cumsum(counts, axis=1, out=cumsum[:, 1:])
+    avg_after = (cumsum[:, window + 1:] - cumsum[:, 1:n_years - window + 1]) / window
+    base = counts[:, :n_years - window].astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jumps = (avg_after - base) / base * 100
+    jumps[base == 0] = np.nan
+    return jumps
+
+
+def top_spikes(counts, row_offset, top_k, min_debut_count, window=WINDOW, best_per_name=False):
+    # returns (name_id, year_index, jump) rows for the top_k spikes of this chunk
+    jumps = jump_matrix(counts, window)
+    jumps[counts[:, :jumps.shape[1]] < min_debut_count] = np.nan
+    jumps = np.nan_to_num(jumps, nan=-np.inf)
+    if best_per_name:
+        # keep only each name's biggest spike before ranking the names against each other
+        cols = jumps.argmax(axis=1) if jumps.shape[1] else np.zeros(len(jumps), dtype=np.intp)
+        scores = jumps[np.arange(len(jumps)), cols] if jumps.shape[1] else np.full(len(jumps), -np.inf)
+        rows = np.arange(len(jumps))
+    else:
+        scores = jumps.ravel()
+        rows, cols = np.unravel_index(np.arange(scores.size), jumps.shape)
+    k = min(top_k, int(np.isfinite(scores).sum()))
+    if k == 0:
+        return np.empty((0, 3))
+    best = np.argpartition(scores, -k)[-k:]
+    return np.column_stack([rows[best] + row_offset, cols[best], scores[best]])
+
+
+def _init_worker(folder_path):
+    global _worker_store
+    # every worker maps the same cache files, so the corpus is not copied per process
+    _worker_store = load_name_store(folder_path)
+
+
+def _scan_chunk(args):
+    lo, hi, top_k, min_debut_count, gender, window, best_per_name = args
+    counts = collapse_gender(np.asarray(_worker_store.counts[lo:hi]), gender)
+    return top_spikes(counts, lo, top_k, min_debut_count, window, best_per_name)
+
+
+def find_breakouts(folder_path, top_k=100, min_debut_count=5, gender=None, window=WINDOW,
+                   workers=None, chunk_size=5000, best_per_name=False):
+    store = load_name_store(folder_path)
+    n_names = len(store.names)
+    # each chunk keeps its own top_k, which is enough to merge into the global top_k
+    tasks = [(lo, min(lo + chunk_size, n_names), top_k, min_debut_count, gender, window, best_per_name)
+             for lo in range(0, n_names, chunk_size)]
+
+    if workers == 1:
+        _init_worker(folder_path)
+        results = [_scan_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(folder_path,)) as pool:
+            results = list(pool.map(_scan_chunk, tasks))
+
+    candidates = np.concatenate(results) if results else np.empty((0, 3))
+    name_ids = candidates[:, 0].astype(np.intp)
+    year_idx = candidates[:, 1].astype(np.intp)
+    unique_ids = np.unique(name_ids)
+    counts = collapse_gender(np.asarray(store.counts[unique_ids]), gender)
+    rows = np.searchsorted(unique_ids, name_ids)
+    debut_counts = counts[rows, year_idx]
+    # mean of the window after each spike year, gathered with one fancy index
+    after = year_idx[:, None] + np.arange(1, window + 1)
+    avg_after = counts[rows[:, None], after].mean(axis=1) if len(rows) else np.array([])
+
+    breakouts = pd.DataFrame({
+        'name': store.names[name_ids],
+        'year': store.years[year_idx],
+        'debut_count': debut_counts,
+        'avg_after': avg_after,
+        'percentage_jump': candidates[:, 2],
+    }).sort_values('percentage_jump', ascending=False)
+    return breakouts.head(top_k).reset_index(drop=True)
+
+
+if __name__ == "__main__":
+    folder_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'names_extracted')
+    breakouts = find_breakouts(folder_path, top_k=200, min_debut_count=20, best_per_name=True)
+    print(breakouts.head(50).to_string())
+
+    os.makedirs('output', exist_ok=True)
+    breakouts.to_csv('output/name_breakouts.csv', index=False)
+    print("Breakouts saved to output/name_breakouts.csv")
@@ -0,0 +1,151 @@
+# control-group engine for the TV-name effect
+# for every character name we draw popularity-matched control names from the same debut year and compare
+# the character's 7-year jump with the jumps of the controls, giving empirical p-values and confidence intervals
+import os
+import json
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from name_store import load_name_store
+from breakout_detector import WINDOW, collapse_gender
+
+_worker_store = None
+
+
+def year_jumps(store, year, window=WINDOW, gender=None):
+    # debut counts and jumps of every name in the corpus for one debut year, with the same truncated
+    # window as Scatter3.4 when the debut is less than `window` years before the last year
+    # (None, None) when the store has no debut year or no year after it to measure a jump on
+    y0 = year - int(store.years[0])
+    if y0 < 0 or y0 >= len(store.years) - 1:
+        return None, None
+    y1 = min(y0 + window, len(store.years) - 1)
+    counts = collapse_gender(np.asarray(store.counts[:, y0:y1 + 1]), gender)
+    debut_counts = counts[:, 0]
+    avg_after = counts[:, 1:].mean(axis=1) if counts.shape[1] > 1 else np.zeros(len(counts))
+    jumps = np.full(len(counts), np.nan)
+    positive = debut_counts > 0
+    jumps[positive] = (avg_after[positive] - debut_counts[positive]) / debut_counts[positive] * 100
+    return debut_counts, jumps
+
+
+def matched_pool(debut_counts, target, exclude, tolerance, min_pool):
+    # names whose debut-year count is within +-tolerance (in ratio) of the character's count;
+    # if that band is too thin, fall back to the min_pool nearest names on a log scale (empty if no name debuted)
+    low, high = target / (1 + tolerance), target * (1 + tolerance)
+    pool = np.flatnonzero((debut_counts >= low) & (debut_counts <= high))
+    pool = pool[pool != exclude]
+    if len(pool) >= min_pool:
+        return pool
+    candidates = np.flatnonzero(debut_counts > 0)
+    candidates = candidates[candidates != exclude]
+    if len(candidates) <= min_pool:
+        return candidates
+    distance = np.abs(np.log(debut_counts[candidates]) - np.log(target))
+    nearest = np.argpartition(distance, min_pool - 1)[:min_pool]
+    return candidates[nearest]
+
+
+def _init_worker(folder_path):
+    global _worker_store
+    _worker_store = load_name_store(folder_path)
+
+
+def _test_year(args):
+    year, characters, n_controls, tolerance, min_pool, gender, window, seed = args
+    store = _worker_store
+    debut_counts, jumps = year_jumps(store, year, window, gender)
+    if debut_counts is None:
+        print(f"Skipping debut year {year}: outside the years {store.years[0]}-{store.years[-1] - 1} that have a jump")
+        return [(show, name, year, 0, np.nan, None) for name, show in characters]
+    rng = np.random.default_rng([seed, year])
+    ids = store.name_ids([name for name, _ in characters])
+    results = []
+    for (name, show), name_id in zip(characters, ids):
+        if name_id < 0 or debut_counts[name_id] == 0:
+            results.append((show, name, year, 0, np.nan, None))
+            continue
+        pool = matched_pool(debut_counts, debut_counts[name_id], name_id, tolerance, min_pool)
+        if not len(pool):
+            results.append((show, name, year, int(debut_counts[name_id]), jumps[name_id], None))
+            continue
+        draws = jumps[rng.choice(pool, size=n_controls, replace=True)]
+        results.append((show, name, year, int(debut_counts[name_id]), jumps[name_id], (len(pool), draws)))
+    return results
+
+
+def control_group_test(folder_path, all_shows, n_controls=5000, tolerance=0.25, min_pool=50, gender=None,
+                       window=WINDOW, workers=None, seed=42, ci=95):
+    # one task per debut year, so each worker pulls that year's columns once and tests all its characters
+    by_year = {}
+    for show in all_shows:
+        for character in show['characters']:
+            by_year.setdefault(show['release_year'], []).append((character.split()[0], show['tv_show_name']))
+    tasks = [(year, characters, n_controls, tolerance, min_pool, gender, window, seed)
+             for year, characters in sorted(by_year.items())]
+
+    if workers == 1:
+        _init_worker(folder_path)
+        results = [_test_year(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(folder_path,)) as pool:
+            results = list(pool.map(_test_year, tasks))
+
+    alpha = (100 - ci) / 2
+    name_rows = []
+    show_draws = {}
+    for show, name, year, debut_count, jump, controls in (row for year_rows in results for row in year_rows):
+        if controls is None:
+            continue
+        pool_size, draws = controls
+        low, high = np.percentile(draws, [alpha, 100 - alpha])
+        name_rows.append({
+            'show': show,
+            'name': name,
+            'debut_year': year,
+            'debut_count': debut_count,
+            'percentage_jump': jump,
+            'control_mean': draws.mean(),
+            'control_ci_low': low,
+            'control_ci_high': high,
+            'excess_jump': jump - draws.mean(),
+            # one-sided: how often a matched control grew at least as much as the character name
+            'p_value': (1 + np.sum(draws >= jump)) / (n_controls + 1),
+            'pool_size': pool_size,
+        })
+        show_draws.setdefault(show, []).append((jump, draws))
+
+    show_rows = []
+    for show, pairs in show_draws.items():
+        # the show's mean jump against the mean of one matched control per character, draw by draw
+        observed = np.mean([jump for jump, _ in pairs])
+        null_means = np.mean([draws for _, draws in pairs], axis=0)
+        low, high = np.percentile(null_means, [alpha, 100 - alpha])
+        show_rows.append({
+            'show': show,
+            'mean_jump': observed,
+            'control_mean': null_means.mean(),
+            'control_ci_low': low,
+            'control_ci_high': high,
+            'p_value': (1 + np.sum(null_means >= observed)) / (n_controls + 1),
+            'number_of_names': len(pairs),
+        })
+    return pd.DataFrame(name_rows), pd.DataFrame(show_rows)
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    folder_path = os.path.join(base_dir, 'data', 'names_extracted')
+    with open(os.path.join(base_dir, 'data', 'tv_shows_new_release.json'), 'r') as file:
+        all_shows = json.load(file)
+
+    name_results, show_results = control_group_test(folder_path, all_shows)
+    pd.set_option('display.width', 200)
+    print(name_results.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+    print()
+    print(show_results.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    os.makedirs('output', exist_ok=True)
+    name_results.to_csv('output/control_group_names.csv', index=False)
+    show_results.to_csv('output/control_group_shows.csv', index=False)
+    print("Results saved to output/control_group_names.csv and output/control_group_shows.csv")
@@ -1,43 +1,34 @@
-import os
-import pandas as pd
 import matplotlib.pyplot as plt
 import json
+from name_store import LazyNameStore
+from name_summary import load_name_summary
+from name_variants import load_variant_index
 
 def load_data(folder_path):
-    data = {}
-    for year in range(1970, 2023 + 1):
-        file_path = os.path.join(folder_path, f'yob{year}.txt')
-        if os.path.exists(file_path):
-            df = pd.read_csv(file_path, names=['name', 'gender', 'count'])
-            data[year] = df
-    return data
+    return LazyNameStore(folder_path, 1970, 2023)
 
-def get_counts(name, data, start_year):
-    counts = []
-    for year in range(start_year, start_year + 8):
-        if year in data:
-            count = data[year][data[year]['name'] == name]['count'].sum()
-            counts.append(count)
-        else:
-            counts.append(0)
-    return counts
+def get_counts(name, data, start_year, variant_index=None):
+    return data.get_counts_many([name], start_year, start_year + 7, variant_index=variant_index)[0].tolist()
 
-def plot_trends(shows, name_data, file_name):
+def plot_trends(shows, name_data, summary, file_name, variant_index=None):
     plt.figure(figsize=(8.5, 4))
     colors = ['blue', 'red', 'green', 'orange', 'purple', 'magenta', 'yellow', 'brown', 'pink', 'black']
     color_index = 0
 
     for show in shows:
         debut_year = show['release_year']
-        for character in show['characters']:
-            first_name = character.split()[0]
-            debut_count = get_counts(first_name, name_data, debut_year)[0]
-            if debut_count == 0:
-                counts = get_counts(first_name, name_data, debut_year)
-                x_values = range(0, 8)
-                plt.plot(x_values, counts, label=f"{first_name} ({show['tv_show_name']} {debut_year})",
-                         color=colors[color_index % len(colors)])
-                color_index += 1
+        first_names = [character.split()[0] for character in show['characters']]
+        # the summary answers "zero at debut" from the debut year alone; only those names get their 8 years
+        zero = summary.zero_at_debut(first_names, debut_year, variant_index=variant_index)
+        zero_names = [name for name, is_zero in zip(first_names, zero) if is_zero]
+        if not zero_names:
+            continue
+        show_counts = name_data.get_counts_many(zero_names, debut_year, debut_year + 7, variant_index=variant_index)
+        for first_name, counts in zip(zero_names, show_counts):
+            x_values = range(0, 8)
+            plt.plot(x_values, counts, label=f"{first_name} ({show['tv_show_name']} {debut_year})",
+                     color=colors[color_index % len(colors)])
+            color_index += 1
 
     if color_index > 0:
         plt.title('7-Year Popularity Trends for Names with 0-5 Babies at TV Show Debut')
@@ -59,9 +50,15 @@ def load_shows(file_path):
 if __name__ == "__main__":
     folder_path = r'C:\Users\ybars\OneDrive - huji.ac.il\HUJI Documents Shana BET\MATAR Bet\Data Mining 47717\babynames text files'
     name_data = load_data(folder_path)
+    summary = load_name_summary(folder_path, store=name_data)
 
     shows_file_path = r'C:\Users\ybars\PycharmProjects\datamining\DM_Names_new_approach\output\tv_shows_new_release.json'
     all_shows = load_shows(shows_file_path)
 
+    # count spelling variants (Arya/Aria, Jon/John) together with the character's first name
+    merge_spelling_variants = False
+    variant_index = load_variant_index(folder_path) if merge_spelling_variants else None
+
     file_name = "line_graph5zeros.py"
-    plot_trends(all_shows, name_data, file_name)
+    plot_trends(all_shows, name_data, summary, file_name, variant_index)
+    print(f"Years loaded: {name_data.touched_summary()}")
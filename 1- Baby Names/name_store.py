@@ -0,0 +1,479 @@
+# columnar store of the SSA baby-name corpus
+# every name gets an integer id (its row), year is the second axis and gender is the last axis,
+# so a name's whole trajectory is counts[name_id] instead of a scan over every year's DataFrame
+# the parsed store is cached as memory-mapped files in data/names_cache/ and rebuilt only
+# when one of the yob files changes; a new yob year is appended to the cache in place
+import os
+import re
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+
+FIRST_YEAR = 1880
+LAST_YEAR = 2023
+GENDERS = ('F', 'M')
+CACHE_DIR_NAME = 'names_cache'
+MANIFEST_FILE = 'manifest.json'
+CACHE_VERSION = 3
+YEAR_SLACK = 10         # spare year columns reserved in counts.bin so new years can be appended in place
+ROLLING_WINDOW = 7
+YOB_PATTERN = re.compile(r'^yob(\d{4})\.txt$')
+
+
+class NameStore:
+    def __init__(self, names, years, counts, order=None):
+        self.names = names      # array of unique names, the row index is the name id
+        self.years = years      # consecutive years covered by the year axis
+        self.counts = counts    # int32 array of shape (len(names), len(years), 2), channels follow GENDERS
+        self.order = order      # permutation that sorts names, None when names are already sorted
+        self.memo = {}          # (name, start_year, end_year, gender) -> counts row already gathered
+
+    def name_id(self, name):
+        i = self.name_ids([name])[0]
+        return int(i) if i >= 0 else None
+
+    def gender_channel(self, gender):
+        if gender is None:
+            return None
+        return GENDERS.index(gender)
+
+    def name_counts(self, name, start_year, end_year=LAST_YEAR, gender=None):
+        # years outside the store (or an unknown name) count as 0, same as a missing yob file
+        return self.gather_counts([name], start_year, end_year, gender)[0]
+
+    def name_ids(self, names):
+        # vectorized name_id: -1 marks names that never appear in the corpus
+        names = np.asarray(names, dtype=str)
+        pos = np.searchsorted(self.names, names, sorter=self.order)
+        found = pos < len(self.names)
+        ids = pos.copy()
+        if self.order is not None:
+            ids[found] = self.order[pos[found]]
+        found[found] = self.names[ids[found]] == names[found]
+        return np.where(found, ids, -1)
+
+    def gather_counts(self, names, start_year, end_year=LAST_YEAR, gender=None):
+        out = np.zeros((len(names), end_year - start_year + 1), dtype=np.int64)
+        ids = self.name_ids(names)
+        lo = max(start_year, int(self.years[0]))
+        hi = min(end_year, int(self.years[-1]))
+        known = ids >= 0
+        if lo <= hi and known.any():
+            rows = self.counts[ids[known], lo - self.years[0]:hi - self.years[0] + 1]
+            channel = self.gender_channel(gender)
+            out[known, lo - start_year:hi - start_year + 1] = rows.sum(axis=2) if channel is None else rows[:, :, channel]
+        return out
+
+    def get_counts_many(self, names, start_year, end_year=LAST_YEAR, gender=None, variant_index=None):
+        # one gather for every name that is not memoized yet, returns a (len(names), years) array
+        names = list(names)
+        if variant_index is not None and names:
+            # each row becomes the sum over the name's spelling variants (see name_variants.py)
+            flat, starts = variant_index.expand(names)
+            return np.add.reduceat(self.get_counts_many(flat, start_year, end_year, gender), starts, axis=0)
+        missing = [name for name in dict.fromkeys(names) if (name, start_year, end_year, gender) not in self.memo]
+        if missing:
+            for name, row in zip(missing, self.gather_counts(missing, start_year, end_year, gender)):
+                self.memo[(name, start_year, end_year, gender)] = row
+        if not names:
+            return np.zeros((0, end_year - start_year + 1), dtype=np.int64)
+        return np.stack([self.memo[(name, start_year, end_year, gender)] for name in names])
+
+
+class LazyNameStore(NameStore):
+    # same queries as NameStore, but a year partition is only loaded the first time a query touches it:
+    # from the mapped cache (built, or appended to, first when it is out of date, as load_name_store does), or
+    # with use_cache=False by parsing just that year's yob file
+    def __init__(self, folder_path, start_year=FIRST_YEAR, end_year=LAST_YEAR, cache_dir=None, use_cache=True):
+        NameStore.__init__(self, None, np.arange(start_year, end_year + 1), None)
+        self.folder_path = folder_path
+        self.partitions = {}        # year -> (sorted names, (n, 2) counts) or None when the file is missing
+        self.touched_years = set()
+        self.vocabulary = None      # sorted names of every partition, once they have all been loaded
+        self.mapped = None
+        if use_cache and os.path.isdir(folder_path) and list_yob_files(folder_path):
+            self.mapped = load_cached_name_store(folder_path, cache_dir)
+
+    @property
+    def names(self):
+        # the full vocabulary needs every year, so asking for it loads (or maps) the whole range
+        if self.mapped is not None:
+            self.touched_years.update(int(year) for year in self.years)
+            return self.mapped.names
+        if self.vocabulary is None:
+            for year in self.years:
+                self.partition(int(year))
+            loaded = [names for names, _ in (p for p in self.partitions.values() if p is not None)]
+            self.vocabulary = np.unique(np.concatenate(loaded)) if loaded else np.array([], dtype=str)
+        return self.vocabulary
+
+    @names.setter
+    def names(self, names):
+        # NameStore.__init__ assigns the names; a lazy store only knows them once its partitions are loaded
+        self.vocabulary = names
+
+    def partition(self, year):
+        if year not in self.partitions:
+            file_path = os.path.join(self.folder_path, f'yob{year}.txt')
+            if not os.path.exists(file_path):
+                self.partitions[year] = None
+            else:
+                df = pd.read_csv(file_path, names=['name', 'gender', 'count'])
+                name_ids, names = pd.factorize(df['name'], sort=True)
+                counts = np.zeros((len(names), len(GENDERS)), dtype=np.int32)
+                counts[name_ids, (df['gender'].to_numpy() == 'M').astype(np.intp)] = df['count'].to_numpy()
+                self.partitions[year] = (np.asarray(names, dtype=str), counts)
+        return self.partitions[year]
+
+    def name_ids(self, names):
+        return self.mapped.name_ids(names) if self.mapped is not None else NameStore.name_ids(self, names)
+
+    def gather_counts(self, names, start_year, end_year=LAST_YEAR, gender=None):
+        lo = max(start_year, int(self.years[0]))
+        hi = min(end_year, int(self.years[-1]))
+        self.touched_years.update(range(lo, hi + 1))
+        if self.mapped is not None:
+            out = self.mapped.gather_counts(names, start_year, end_year, gender)
+            # the cache may cover more years than this store was opened for
+            out[:, :max(0, lo - start_year)] = 0
+            out[:, max(0, hi - start_year + 1):] = 0
+            return out
+        out = np.zeros((len(names), end_year - start_year + 1), dtype=np.int64)
+        names = np.asarray(names, dtype=str)
+        channel = self.gender_channel(gender)
+        for year in range(lo, hi + 1):
+            partition = self.partition(year)
+            if partition is None:
+                continue
+            year_names, counts = partition
+            ids = np.minimum(np.searchsorted(year_names, names), len(year_names) - 1)
+            found = year_names[ids] == names
+            column = counts[ids[found]]
+            out[found, year - start_year] = column.sum(axis=1) if channel is None else column[:, channel]
+        return out
+
+    def touched_summary(self):
+        # touched years as compact ranges, e.g. "1990-2023, 2005"
+        years = sorted(self.touched_years)
+        ranges = []
+        for year in years:
+            if ranges and year == ranges[-1][1] + 1:
+                ranges[-1][1] = year
+            else:
+                ranges.append([year, year])
+        return ', '.join(f"{a}-{b}" if a != b else f"{a}" for a, b in ranges) or 'none'
+
+
+def load_yob_files(folder_path, start_year=FIRST_YEAR, end_year=LAST_YEAR):
+    frames = []
+    for year in range(start_year, end_year + 1):
+        file_path = os.path.join(folder_path, f'yob{year}.txt')
+        if os.path.exists(file_path):
+            df = pd.read_csv(file_path, names=['name', 'gender', 'count'])
+            df['year'] = year
+            frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['name', 'gender', 'count', 'year'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def build_name_store(df, start_year=FIRST_YEAR, end_year=LAST_YEAR):
+    # factorize with sort=True interns the names in sorted order, so lookups are a binary search
+    name_ids, names = pd.factorize(df['name'], sort=True)
+    years = np.arange(start_year, end_year + 1)
+    counts = np.zeros((len(names), len(years), len(GENDERS)), dtype=np.int32)
+    channels = (df['gender'].to_numpy() == 'M').astype(np.intp)
+    # each (name, gender, year) appears once in the SSA files, so a plain scatter is enough
+    counts[name_ids, df['year'].to_numpy() - start_year, channels] = df['count'].to_numpy()
+    return NameStore(np.asarray(names, dtype=str), years, counts)
+
+
+def default_cache_dir(folder_path):
+    # the cache lives next to the extracted files, e.g. data/names_cache/ beside data/names_extracted/
+    return os.path.join(os.path.dirname(os.path.abspath(folder_path)), CACHE_DIR_NAME)
+
+
+def list_yob_files(folder_path):
+    files = {}
+    for file_name in os.listdir(folder_path):
+        match = YOB_PATTERN.match(file_name)
+        if match:
+            files[int(match.group(1))] = file_name
+    return dict(sorted(files.items()))
+
+
+def file_sha1(file_path):
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def source_fingerprint(file_path, with_hash=True):
+    stat = os.stat(file_path)
+    entry = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size}
+    if with_hash:
+        entry['sha1'] = file_sha1(file_path)
+    return entry
+
+
+def read_manifest(cache_dir):
+    manifest_path = os.path.join(cache_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, 'r') as f:
+        return json.load(f)
+
+
+def write_manifest(cache_dir, manifest):
+    tmp_path = os.path.join(cache_dir, MANIFEST_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(cache_dir, MANIFEST_FILE))
+
+
+def cache_status(folder_path, cache_dir, manifest):
+    # 'fresh' when every cached yob file is unchanged and nothing is new, 'append' (with the new years) when
+    # the only difference is yob files for the years right after the cached range, 'stale' otherwise
+    # a stat() per file is enough on the hot path; the hash is only checked when mtime/size moved,
+    # so touching a file without changing it does not force a rebuild
+    if manifest is None or manifest.get('version') != CACHE_VERSION:
+        return 'stale', []
+    sources = manifest['sources']
+    files = list_yob_files(folder_path)
+    if not set(sources) <= set(files.values()):
+        return 'stale', []
+    touched = False
+    for file_name in sources:
+        file_path = os.path.join(folder_path, file_name)
+        stat = os.stat(file_path)
+        entry = sources[file_name]
+        if stat.st_mtime_ns == entry['mtime_ns'] and stat.st_size == entry['size']:
+            continue
+        if stat.st_size != entry['size'] or file_sha1(file_path) != entry['sha1']:
+            return 'stale', []
+        entry['mtime_ns'] = stat.st_mtime_ns
+        touched = True
+    if touched:
+        write_manifest(cache_dir, manifest)
+    new_years = sorted(year for year, file_name in files.items() if file_name not in sources)
+    if not new_years:
+        return 'fresh', []
+    if new_years != list(range(manifest['last_year'] + 1, manifest['last_year'] + 1 + len(new_years))):
+        return 'stale', []
+    return 'append', new_years
+
+
+def cache_is_fresh(folder_path, cache_dir, manifest):
+    return cache_status(folder_path, cache_dir, manifest)[0] == 'fresh'
+
+
+def save_npy(cache_dir, file_name, array):
+    # write under a temporary name first so readers never map a half-written file
+    tmp_path = os.path.join(cache_dir, file_name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, os.path.join(cache_dir, file_name))
+
+
+YEAR_ARRAYS = ('counts.bin', 'ranks.bin')
+PER_NAME_AGGREGATES = ('total', 'peak_count', 'peak_year', 'first_year', 'last_year', 'rolling_sum')
+
+
+def counts_path(cache_dir):
+    return os.path.join(cache_dir, 'counts.bin')
+
+
+def map_year_array(cache_dir, file_name, manifest, mode='r'):
+    # counts.bin and ranks.bin are raw (names, year_capacity, 2) int32 arrays; the shape lives in the manifest,
+    # so rows for new names are appended to the end of the file and a new year fills a spare year column
+    return np.memmap(os.path.join(cache_dir, file_name), dtype=np.int32, mode=mode,
+                     shape=(manifest['n_names'], manifest['year_capacity'], len(GENDERS)))
+
+
+def map_counts(cache_dir, manifest, mode='r'):
+    return map_year_array(cache_dir, 'counts.bin', manifest, mode)
+
+
+def compute_ranks(column):
+    # SSA-style rank within each gender for one year: 1 for the most babies, ties share the better rank,
+    # 0 for names not given that year
+    ranks = np.zeros(column.shape, dtype=np.int32)
+    for channel in range(column.shape[1]):
+        negated = -column[:, channel].astype(np.int64)
+        ranks[:, channel] = np.searchsorted(np.sort(negated), negated, side='left') + 1
+    ranks[column == 0] = 0
+    return ranks
+
+
+def compute_aggregates(counts, years):
+    # per-name, per-gender totals, peak, first/last year given and the rolling sum over the last
+    # ROLLING_WINDOW years, plus the total births per year used for shares
+    counts = np.asarray(counts)
+    given = counts > 0
+    ever_given = given.any(axis=1)
+    last_index = counts.shape[1] - 1 - given[:, ::-1].argmax(axis=1)
+    return {
+        'total': counts.sum(axis=1, dtype=np.int64),
+        'peak_count': counts.max(axis=1) if counts.shape[1] else np.zeros((len(counts), len(GENDERS)), np.int32),
+        'peak_year': np.where(ever_given, years[0] + counts.argmax(axis=1), 0).astype(np.int32),
+        'first_year': np.where(ever_given, years[0] + given.argmax(axis=1), 0).astype(np.int32),
+        'last_year': np.where(ever_given, years[0] + last_index, 0).astype(np.int32),
+        'rolling_sum': counts[:, -ROLLING_WINDOW:].sum(axis=1, dtype=np.int64),
+        'year_totals': counts.sum(axis=0, dtype=np.int64),
+        'through_year': np.array(int(years[-1])),
+    }
+
+
+def save_aggregates(cache_dir, aggregates):
+    tmp_path = os.path.join(cache_dir, 'aggregates.npz.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, **aggregates)
+    os.replace(tmp_path, os.path.join(cache_dir, 'aggregates.npz'))
+
+
+def load_aggregates(cache_dir):
+    with np.load(os.path.join(cache_dir, 'aggregates.npz')) as data:
+        return {key: data[key] for key in data.files}
+
+
+def build_name_cache(folder_path, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir(folder_path)
+    os.makedirs(cache_dir, exist_ok=True)
+    files = list_yob_files(folder_path)
+    if not files:
+        raise FileNotFoundError(f"No yob*.txt files found in {folder_path}")
+    first_year, last_year = min(files), max(files)
+    store = build_name_store(load_yob_files(folder_path, first_year, last_year), first_year, last_year)
+    manifest = {
+        'version': CACHE_VERSION,
+        'first_year': first_year,
+        'last_year': last_year,
+        'year_capacity': last_year - first_year + 1 + YEAR_SLACK,
+        'n_names': len(store.names),
+        'sources': {file_name: source_fingerprint(os.path.join(folder_path, file_name))
+                    for file_name in files.values()},
+    }
+    for array_file in YEAR_ARRAYS:
+        tmp_path = os.path.join(cache_dir, array_file + '.tmp')
+        array = np.memmap(tmp_path, dtype=np.int32, mode='w+',
+                          shape=(manifest['n_names'], manifest['year_capacity'], len(GENDERS)))
+        if array_file == 'counts.bin':
+            array[:, :len(store.years)] = store.counts
+        else:
+            for year_index in range(len(store.years)):
+                array[:, year_index] = compute_ranks(store.counts[:, year_index])
+        array.flush()
+        del array
+        os.replace(tmp_path, os.path.join(cache_dir, array_file))
+    save_npy(cache_dir, 'names.npy', store.names)
+    save_npy(cache_dir, 'name_order.npy', np.arange(len(store.names)))
+    save_aggregates(cache_dir, compute_aggregates(store.counts, store.years))
+    write_manifest(cache_dir, manifest)
+    return cache_dir
+
+
+def append_year(folder_path, year, cache_dir=None):
+    # folds one new yobYYYY.txt into the cache: the year column, rows for names never seen before and the
+    # per-name aggregates are all updated in place, so the cost is one year of data rather than the whole corpus
+    cache_dir = cache_dir or default_cache_dir(folder_path)
+    manifest = read_manifest(cache_dir)
+    if manifest is None or year != manifest['last_year'] + 1:
+        raise ValueError(f"Can only append the year after the cached range, got {year}")
+    year_index = year - manifest['first_year']
+    if year_index >= manifest['year_capacity']:
+        # out of spare columns, the next full build reserves a fresh block of them
+        return build_name_cache(folder_path, cache_dir)
+
+    file_name = f'yob{year}.txt'
+    df = pd.read_csv(os.path.join(folder_path, file_name), names=['name', 'gender', 'count'])
+    names = np.load(os.path.join(cache_dir, 'names.npy'))
+    order = np.load(os.path.join(cache_dir, 'name_order.npy'))
+    file_names = df['name'].to_numpy(dtype=str)
+    ids = NameStore(names, None, None, order).name_ids(file_names)
+
+    # names seen for the first time get new rows at the end, keeping every existing name id stable
+    new_mask = ids < 0
+    new_names = pd.unique(file_names[new_mask])
+    if len(new_names):
+        ids[new_mask] = len(names) + pd.Index(new_names).get_indexer(file_names[new_mask])
+        names = np.concatenate([names, new_names])
+        order = np.argsort(names, kind='stable')
+        row_bytes = manifest['year_capacity'] * len(GENDERS) * np.dtype(np.int32).itemsize
+        for array_file in YEAR_ARRAYS:
+            with open(os.path.join(cache_dir, array_file), 'r+b') as f:
+                f.truncate(len(names) * row_bytes)
+    n_old = manifest['n_names']
+    manifest['n_names'] = len(names)
+
+    counts = map_counts(cache_dir, manifest, mode='r+')
+    channels = (df['gender'].to_numpy() == 'M').astype(np.intp)
+    column = np.zeros((len(names), len(GENDERS)), dtype=np.int32)
+    column[ids, channels] = df['count'].to_numpy()
+    counts[:, year_index] = column
+    dropped = np.array(counts[:, year_index - ROLLING_WINDOW]) if year_index >= ROLLING_WINDOW else 0
+    counts.flush()
+    ranks = map_year_array(cache_dir, 'ranks.bin', manifest, mode='r+')
+    ranks[:, year_index] = compute_ranks(column)
+    ranks.flush()
+
+    aggregates = load_aggregates(cache_dir)
+    if int(aggregates['through_year']) < year:
+        grow = len(names) - n_old
+        for key in PER_NAME_AGGREGATES:
+            aggregates[key] = np.concatenate([aggregates[key], np.zeros((grow, len(GENDERS)), aggregates[key].dtype)])
+        aggregates['total'] += column
+        aggregates['rolling_sum'] += column - dropped
+        new_peak = column > aggregates['peak_count']
+        aggregates['peak_count'] = np.where(new_peak, column, aggregates['peak_count'])
+        aggregates['peak_year'] = np.where(new_peak, year, aggregates['peak_year']).astype(np.int32)
+        given = column > 0
+        aggregates['first_year'] = np.where(given & (aggregates['first_year'] == 0), year,
+                                            aggregates['first_year']).astype(np.int32)
+        aggregates['last_year'] = np.where(given, year, aggregates['last_year']).astype(np.int32)
+        aggregates['year_totals'] = np.concatenate([aggregates['year_totals'], column.sum(axis=0, dtype=np.int64)[None]])
+        aggregates['through_year'] = np.array(year)
+        save_aggregates(cache_dir, aggregates)
+
+    save_npy(cache_dir, 'names.npy', names)
+    save_npy(cache_dir, 'name_order.npy', order)
+    manifest['last_year'] = year
+    manifest['sources'][file_name] = source_fingerprint(os.path.join(folder_path, file_name))
+    write_manifest(cache_dir, manifest)
+    return cache_dir
+
+
+def open_name_cache(cache_dir, manifest):
+    # the files are mapped read-only, so several processes share the pages through the OS page cache
+    names = np.load(os.path.join(cache_dir, 'names.npy'), mmap_mode='r')
+    order = np.load(os.path.join(cache_dir, 'name_order.npy'), mmap_mode='r')
+    years = np.arange(manifest['first_year'], manifest['last_year'] + 1)
+    counts = map_counts(cache_dir, manifest)[:, :len(years)]
+    return NameStore(names, years, counts, order)
+
+
+def load_cached_name_store(folder_path, cache_dir=None):
+    cache_dir = cache_dir or default_cache_dir(folder_path)
+    manifest = read_manifest(cache_dir)
+    status, new_years = cache_status(folder_path, cache_dir, manifest)
+    if status == 'append':
+        for year in new_years:
+            print(f"Appending yob{year}.txt to the name cache...")
+            append_year(folder_path, year, cache_dir)
+    elif status == 'stale':
+        print(f"Building name cache in {cache_dir}...")
+        build_name_cache(folder_path, cache_dir)
+    return open_name_cache(cache_dir, read_manifest(cache_dir))
+
+
+def load_name_store(folder_path, start_year=FIRST_YEAR, end_year=LAST_YEAR, use_cache=True):
+    if not use_cache:
+        df = load_yob_files(folder_path, start_year, end_year)
+        return build_name_store(df, start_year, end_year)
+    store = load_cached_name_store(folder_path)
+    # narrow the year axis with a view so the mapped pages are not copied
+    lo = max(start_year, int(store.years[0])) - store.years[0]
+    hi = min(end_year, int(store.years[-1])) - store.years[0] + 1
+    return NameStore(store.names, store.years[lo:hi], store.counts[:, lo:hi], store.order)
@@ -0,0 +1,89 @@
+# per-name summary index on top of the name cache: first/last year given, peak year/count, lifetime total,
+# per-year rank and per-year share of births for every (name, gender)
+# everything is precomputed when the cache is built or a year is appended (see name_store.py), so filters like
+# "zero babies in the debut year" or "top-1000 in year X" are lookups instead of passes over the corpus
+import numpy as np
+import pandas as pd
+from name_store import (GENDERS, default_cache_dir, load_aggregates, load_name_store, map_year_array,
+                        read_manifest)
+
+
+class NameSummary:
+    def __init__(self, store, aggregates, ranks, years):
+        # store answers name ids and counts (the cached NameStore, or a LazyNameStore on the same cache);
+        # years is the cache's year axis, which the ranks and the per-year totals are laid out on
+        self.store = store
+        self.aggregates = aggregates
+        self.years = years
+        self.ranks = ranks[:, :len(years)]          # mapped (names, years, 2) rank array, 0 = not given
+
+    def year_index(self, year):
+        if not self.years[0] <= int(year) <= self.years[-1]:
+            raise ValueError(f"{year} is outside the summary's years {self.years[0]}-{self.years[-1]}")
+        return int(year) - int(self.years[0])
+
+    def table(self):
+        # long table keyed by (name, gender), only pairs that were ever given
+        frames = []
+        for channel, gender in enumerate(GENDERS):
+            given = self.aggregates['total'][:, channel] > 0
+            frames.append(pd.DataFrame({
+                'name': np.asarray(self.store.names)[given],
+                'gender': gender,
+                'first_year': self.aggregates['first_year'][given, channel],
+                'last_year': self.aggregates['last_year'][given, channel],
+                'peak_year': self.aggregates['peak_year'][given, channel],
+                'peak_count': self.aggregates['peak_count'][given, channel],
+                'total': self.aggregates['total'][given, channel],
+            }))
+        return pd.concat(frames, ignore_index=True).set_index(['name', 'gender'])
+
+    def rank(self, names, year, gender):
+        ids = self.store.name_ids(names)
+        ranks = np.zeros(len(ids), dtype=np.int32)
+        ranks[ids >= 0] = self.ranks[ids[ids >= 0], self.year_index(year), GENDERS.index(gender)]
+        return ranks
+
+    def share(self, names, year, gender=None):
+        # fraction of that year's births (of that gender, or overall) that got the name
+        y = self.year_index(year)
+        counts = self.store.gather_counts(names, year, year, gender)[:, 0]
+        year_totals = self.aggregates['year_totals'][y]
+        return counts / (year_totals.sum() if gender is None else year_totals[GENDERS.index(gender)])
+
+    def top_k(self, year, k, gender):
+        y = self.year_index(year)
+        channel = GENDERS.index(gender)
+        ranks = np.asarray(self.ranks[:, y, channel])
+        ids = np.flatnonzero((ranks > 0) & (ranks <= k))
+        ids = ids[np.argsort(ranks[ids], kind='stable')]
+        names = np.asarray(self.store.names)[ids]
+        counts = self.store.gather_counts(names, year, year, gender)[:, 0]
+        return pd.DataFrame({
+            'name': names,
+            'rank': ranks[ids],
+            'count': counts,
+            'share': counts / self.aggregates['year_totals'][y, channel],
+        })
+
+    def zero_at_debut(self, names, year, gender=None, variant_index=None):
+        # boolean mask over names: no babies at all in the given year (under any spelling with a variant_index)
+        self.year_index(year)
+        return self.store.get_counts_many(names, year, year, gender, variant_index)[:, 0] == 0
+
+    def given_between(self, names, start_year, end_year, gender):
+        # names whose first and last appearance both fall inside the range, straight from the per-name years
+        ids = self.store.name_ids(names)
+        channel = GENDERS.index(gender)
+        first = np.where(ids >= 0, self.aggregates['first_year'][ids, channel], 0)
+        last = np.where(ids >= 0, self.aggregates['last_year'][ids, channel], 0)
+        return (ids >= 0) & (first >= start_year) & (last <= end_year) & (first > 0)
+
+
+def load_name_summary(folder_path, cache_dir=None, store=None):
+    # pass the store a script already opened (e.g. a LazyNameStore) to answer the counts through it
+    store = store if store is not None else load_name_store(folder_path)
+    cache_dir = cache_dir or default_cache_dir(folder_path)
+    manifest = read_manifest(cache_dir)
+    years = np.arange(manifest['first_year'], manifest['last_year'] + 1)
+    return NameSummary(store, load_aggregates(cache_dir), map_year_array(cache_dir, 'ranks.bin', manifest), years)
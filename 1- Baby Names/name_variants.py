@@ -0,0 +1,166 @@
+# spelling-variant index over the name corpus, so Arya/Aria, Jon/John or Daenerys/Danerys can be counted together
+# two names are variants when they share a soundex code and their normalized spellings are equal, or when the
+# spellings themselves differ by one extra vowel inside a vowel pair (Daenerys/Danerys) and the name keeps
+# another vowel group (so Joan/Jon, Jon/Jeon stay apart); the clusters are built once for the whole vocabulary
+# and kept in the name cache
+import os
+import numpy as np
+import pandas as pd
+from name_store import default_cache_dir, file_sha1, load_name_store
+
+VOWELS = 'aeiou'
+VARIANT_VERSION = 2     # bumped whenever the matching rules change, so cached indexes are rebuilt
+MAX_EDITS = 2           # edits (a swap of two letters is one) allowed between the spellings of two variants
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(['aeiouyhw', 'bfpv', 'cgjkqsxz', 'dt', 'l', 'mn', 'r'])
+                 for c in letters}
+
+
+def soundex(name):
+    name = name.lower()
+    if not name:
+        return ''
+    digits = []
+    previous = SOUNDEX_CODES.get(name[0], '')
+    for c in name[1:]:
+        code = SOUNDEX_CODES.get(c, '')
+        if code and code != '0' and code != previous:
+            digits.append(code)
+        if c not in 'hw':
+            previous = code
+    return (name[0].upper() + ''.join(digits) + '000')[:4]
+
+
+def silent_h(key, i):
+    before = key[i - 1]
+    after = key[i + 1] if i + 1 < len(key) else ''
+    if before in 'csgtp':
+        return False
+    # after a consonant (Jhon) or between a vowel and a consonant or the end (John, Sarah)
+    return before not in VOWELS or not after or after not in VOWELS
+
+
+def vowel_groups(key):
+    # number of runs of vowels, e.g. 2 for "daen" ... "joan" has 1
+    return sum(1 for i, c in enumerate(key) if c in VOWELS and (i == 0 or key[i - 1] not in VOWELS))
+
+
+def edit_distance(a, b):
+    # Levenshtein distance where swapping two neighbouring letters counts as one edit (John/Jhon)
+    a, b = a.lower(), b.lower()
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def one_vowel_apart(a, b):
+    # the original spellings differ by one inner vowel dropped from a vowel pair (Daenerys/Danerys), not by a
+    # y (Arya/Ara) or a vowel between consonants (Araya/Arya)
+    a, b = a.lower(), b.lower()
+    if len(a) < len(b):
+        a, b = b, a
+    if len(a) != len(b) + 1:
+        return False
+    return any(a[:i] + a[i + 1:] == b and a[i] in VOWELS and (a[i - 1] in VOWELS or a[i + 1] in VOWELS)
+               for i in range(1, len(a) - 1))
+
+
+def variant_key(name):
+    # spelling normalization: y and i are the same vowel sound, ph is f, a silent h is dropped (Jhon, John,
+    # Sarah; but not the h of ch/sh/th/gh) and doubled letters are collapsed (Ellie, Elie)
+    key = name.lower().replace('ph', 'f')
+    key = key[:1] + key[1:].replace('y', 'i')
+    key = ''.join(c for i, c in enumerate(key) if not (c == 'h' and i > 0 and silent_h(key, i)))
+    return ''.join(c for i, c in enumerate(key) if i == 0 or c != key[i - 1])
+
+
+class VariantIndex:
+    def __init__(self, names, ptr, ids):
+        self.names = names          # vocabulary the ids refer to
+        self.ptr = ptr              # CSR offsets: the variants of name i are ids[ptr[i]:ptr[i + 1]]
+        self.ids = ids
+        self.lookup = pd.Index(names)
+
+    def variants(self, name):
+        i = self.lookup.get_indexer([name])[0]
+        if i < 0:
+            return [name]
+        return self.names[self.ids[self.ptr[i]:self.ptr[i + 1]]].tolist()
+
+    def expand(self, names):
+        # flattens every name's cluster into one list for a single gather; starts[k] is where name k's cluster
+        # begins, so np.add.reduceat(rows, starts) sums the cluster back into one row per name
+        positions = self.lookup.get_indexer(list(names))
+        flat = []
+        starts = []
+        for name, i in zip(names, positions):
+            starts.append(len(flat))
+            flat.extend(self.names[self.ids[self.ptr[i]:self.ptr[i + 1]]].tolist() if i >= 0 else [name])
+        return flat, np.array(starts, dtype=np.intp)
+
+
+def build_variant_index(names):
+    names = np.asarray(names, dtype=str)
+    keys = pd.Series([variant_key(name) for name in names])
+    key_codes, unique_keys = pd.factorize(keys)
+    key_soundex = [soundex(key) for key in unique_keys]
+    key_lookup = pd.Index(unique_keys)
+
+    # key -> keys one deletion away (and back), found by hashing the single-letter deletions of every key;
+    # only an inner vowel next to another vowel may be dropped, and never from the key's only vowel group:
+    # first and last letters often carry the gender or a different name altogether (Rose/Ross), and the only
+    # vowel sound of a short name is what tells it apart (Joan/Jon/Jean)
+    linked = [[] for _ in range(len(unique_keys))]
+    for k, key in enumerate(unique_keys):
+        if vowel_groups(key) < 2:
+            continue
+        deletions = list(dict.fromkeys(key[:i] + key[i + 1:] for i in range(1, len(key) - 1)
+                                       if key[i] in VOWELS and (key[i - 1] in VOWELS or key[i + 1] in VOWELS)))
+        for j in key_lookup.get_indexer(deletions):
+            if j >= 0 and j != k and key_soundex[j] == key_soundex[k]:
+                linked[k].append(j)
+                linked[j].append(k)
+
+    # names grouped by key; a name's cluster is the members of its key, plus the members of linked keys whose
+    # spelling is one vowel away from its own, and only those within MAX_EDITS of its own spelling: the keys
+    # only find the candidates, a key alone would chain Arya to Ara and Arra through "aria" -> "ara" or to
+    # Aariyah through "aria"
+    members_order = np.argsort(key_codes, kind='stable')
+    members_ptr = np.searchsorted(key_codes[members_order], np.arange(len(unique_keys) + 1))
+    members = [members_order[members_ptr[k]:members_ptr[k + 1]] for k in range(len(unique_keys))]
+    clusters = []
+    for n, k in enumerate(key_codes):
+        candidates = list(members[k]) + [m for j in sorted(set(linked[k])) for m in members[j]
+                                         if one_vowel_apart(names[n], names[m])]
+        clusters.append(np.array(sorted(m for m in candidates
+                                        if m == n or edit_distance(names[n], names[m]) <= MAX_EDITS),
+                                 dtype=np.int64))
+    sizes = np.array([len(cluster) for cluster in clusters], dtype=np.int64)
+    ptr = np.concatenate([[0], np.cumsum(sizes)])
+    ids = np.concatenate(clusters) if len(names) else np.array([], dtype=np.int64)
+    return VariantIndex(names, ptr, ids)
+
+
+def load_variant_index(folder_path, cache_dir=None):
+    # rebuilt whenever the cached vocabulary changed (a rebuild or an appended year): the index is keyed on the
+    # hash of names.npy, since its ids are positions in that array
+    store = load_name_store(folder_path)
+    cache_dir = cache_dir or default_cache_dir(folder_path)
+    names_sha1 = file_sha1(os.path.join(cache_dir, 'names.npy'))
+    index_path = os.path.join(cache_dir, 'variants.npz')
+    if os.path.exists(index_path):
+        with np.load(index_path) as data:
+            if int(data.get('version', 1)) == VARIANT_VERSION and str(data.get('names_sha1', '')) == names_sha1:
+                return VariantIndex(np.asarray(store.names), data['ptr'], data['ids'])
+    print(f"Building spelling-variant index in {cache_dir}...")
+    index = build_variant_index(store.names)
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        np.savez(f, ptr=index.ptr, ids=index.ids, names_sha1=names_sha1, version=VARIANT_VERSION)
+    os.replace(tmp_path, index_path)
+    return index
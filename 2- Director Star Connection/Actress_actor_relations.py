@@ -1,45 +1,35 @@
 import pandas as pd
 import re
 import matplotlib.pyplot as plt
+from collab_store import FREQUENT_MIN, aggregate_collaborations, build_collab_store
 
 # Step 1: Load the dataset (assuming the same dataset for both actors and actresses)
 file_path = './data/imdb-movies-dataset.csv'
 df = pd.read_csv(file_path)
+frequent_min = FREQUENT_MIN  # films with the same director for a collaboration to count as frequent
 
-# Step 2: Create a new DataFrame with 'Director', 'Cast', and 'Title' columns where 'Cast' is split into individual actors
-df_exploded = df[['Director', 'Cast', 'Title']].copy()
-df_exploded['Cast'] = df_exploded['Cast'].str.split(', ')
-df_exploded = df_exploded.explode('Cast')
+# Step 2: Count the number of times each actor has worked with each director and list the movies they made
+# together, in one pass over the exploded Cast (see aggregate_collaborations in collab_store.py)
+collabs = aggregate_collaborations(df, frequent_min)
 
-# Step 3: Count the number of times each actor has worked with each director
-director_actor_count = df_exploded.groupby(['Director', 'Cast']).size().reset_index(name='Count')
+# Step 3: Split into frequent (at least frequent_min films together) and non-frequent collaborations
+frequent_collabs = collabs[collabs['Frequent']]
+non_frequent_collabs = collabs[~collabs['Frequent']]
 
-# Step 4: Filter the collaborations where the actor/actress has worked with the same director at least 3 times (frequent)
-frequent_collabs = director_actor_count[director_actor_count['Count'] >= 3]
-
-# Step 4.1: Filter the collaborations where the actor/actress has worked with the same director less than 3 times (non-frequent)
-non_frequent_collabs = director_actor_count[director_actor_count['Count'] < 3]
-
-# Step 5: For each director and actor pair, list all the movies they have worked on together
-collab_movies = df_exploded.groupby(['Director', 'Cast'])['Title'].apply(list).reset_index()
-
-# Step 6: Merge the frequent collaborations with the list of movies
-frequent_collab_movies = pd.merge(frequent_collabs, collab_movies, on=['Director', 'Cast'])
-
-# Step 6.1: Merge the non-frequent collaborations with the list of movies
-non_frequent_collab_movies = pd.merge(non_frequent_collabs, collab_movies, on=['Director', 'Cast'])
-
-# Step 7: Select only the relevant columns (Director, Cast, and Movies) and rename them
-frequent_collab_movies = frequent_collab_movies[['Director', 'Cast', 'Title']]
+# Step 4: Select only the relevant columns (Director, Cast, and Movies) and rename them
+frequent_collab_movies = frequent_collabs[['Director', 'Cast', 'Title']]
 frequent_collab_movies.columns = ['Director', 'Actor/Actress', 'Movies']
 
-non_frequent_collab_movies = non_frequent_collab_movies[['Director', 'Cast', 'Title']]
+non_frequent_collab_movies = non_frequent_collabs[['Director', 'Cast', 'Title']]
 non_frequent_collab_movies.columns = ['Director', 'Actor/Actress', 'Movies']
 
-# Step 8: Save the result to a CSV file
+# Step 5: Save the result to a CSV file
 frequent_collab_movies.to_csv('./output/frequent_director_actor_collaborations.csv', index=False)
 non_frequent_collab_movies.to_csv('./output/non_frequent_director_actor_collaborations.csv', index=False)
 
+# Step 5.1: Save the columnar collaboration store (integer keys, no list columns) that Director_success.py loads
+build_collab_store(df)
+
 # Optional: Print the first few rows to check the output
 print("Frequent Collaborations:\n", frequent_collab_movies.head())
 print("\nNon-Frequent Collaborations:\n", non_frequent_collab_movies.head())
@@ -47,11 +37,11 @@ print("\nNon-Frequent Collaborations:\n", non_frequent_collab_movies.head())
 
 # Additional part to process IMDb lists and generate the plots
 def process_imdb_list(file_path_txt, output_prefix):
-    # Step 9: Load the text file containing the IMDB list and rankings
+    # Step 6: Load the text file containing the IMDB list and rankings
     with open(file_path_txt, 'r', encoding='utf-8') as file:
         imdb_actor_list = file.readlines()
 
-    # Step 10: Extract actor names and their rankings from the text file
+    # Step 7: Extract actor names and their rankings from the text file
     actor_ranking_pattern = re.compile(r'^(\d+)\.\s([A-Z][a-z]+(?:\s[A-Z][a-z]+)*)')
 
     # Dictionary to hold the actor names and their corresponding rankings
@@ -68,13 +58,13 @@ def process_imdb_list(file_path_txt, output_prefix):
     actors_in_common_red = set(actor_rankings.keys()) & set(frequent_collabs['Cast'])
     actors_in_common_blue = set(actor_rankings.keys()) & set(non_frequent_collabs['Cast'])
 
-    # Step 11: Save the two lists as CSV files
+    # Step 8: Save the two lists as CSV files
     actors_same_director_df = pd.DataFrame({'Actor': list(actors_in_common_red), 'Category': 'Red'})
     actors_different_directors_df = pd.DataFrame({'Actor': list(actors_in_common_blue), 'Category': 'Blue'})
     actors_same_director_df.to_csv(f'./output/shellys_request/{output_prefix}_actors_same_director_common.csv', index=False)
     actors_different_directors_df.to_csv(f'./output/shellys_request/{output_prefix}_actors_different_directors_common.csv', index=False)
 
-    # Step 12: Prepare the data for the plot using the rankings from the text file
+    # Step 9: Prepare the data for the plot using the rankings from the text file
     sorted_actors = sorted(actor_rankings.items(), key=lambda x: x[1])
     x_labels, y_values = zip(*sorted_actors)
 
@@ -89,7 +79,7 @@ def process_imdb_list(file_path_txt, output_prefix):
     # Determine the colors based on the list membership
     colors = ['red' if actor in actors_in_common_red else 'blue' for actor in x_labels]
 
-    # Step 13: Plotting the graph
+    # Step 10: Plotting the graph
     plt.figure(figsize=(10, 8))
     plt.scatter(x_labels, y_values, c=colors)
 
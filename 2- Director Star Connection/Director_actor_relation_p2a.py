@@ -1,51 +1,50 @@
+import os
 import pandas as pd
 import matplotlib.pyplot as plt
+from collab_index import CollabIndex
+from collab_cube import BUCKET_WIDTH, films_cube, save_cube, cube_ranges
 
 # Load the dataset
 file_path = './data/imdb-movies-dataset.csv'
 df = pd.read_csv(file_path)
+output_folder = './output/shellys_request2'
+os.makedirs(output_folder, exist_ok=True)
 
-# List of directors
-directors = [
-    "Clint Eastwood", "Martin Scorsese", "Francis Ford Coppola", "Tim Burton",
-    "Renny Harlin", "Alfred Hitchcock", "Ron Howard", "Ridley Scott",
-    "Steven Spielberg", "Woody Allen", "Robert Zemeckis", "Steven Soderbergh"
-]
+TOP_ACTORS = 3
 
-# Step 1: Create a new DataFrame with 'Director', 'Cast', and 'Year' columns where 'Cast' is split into individual actors
-df_exploded = df[['Director', 'Cast', 'Year']].copy()
-df_exploded['Cast'] = df_exploded['Cast'].str.split(', ')
-df_exploded = df_exploded.explode('Cast')
-
-# Step 2: Filter the DataFrame for the directors of interest
-df_filtered = df_exploded[df_exploded['Director'].isin(directors)]
-
-# Step 3: Generate the plots for each director
-for director in directors:
-    df_director = df_filtered[df_filtered['Director'] == director]
+# Step 1: Index the exploded cast once (see collab_index.py) for the top actors, and count the films of every
+# director-actor pair per BUCKET_WIDTH-year bucket in one groupby (see collab_cube.py); the loop below only slices
+index = CollabIndex.from_movies(df)
+cube = films_cube(df, BUCKET_WIDTH)
+save_cube(cube, 'films', BUCKET_WIDTH)
+pair_rows = cube_ranges(cube, ['Director', 'Actor'])
+buckets, films = cube['Bucket'].to_numpy(), cube['Films'].to_numpy()
 
+# Step 2: Generate the plots for every director
+for n, director in enumerate(index.directors, 1):
     # Identify the top 3 actors who have worked most frequently with this director
-    top_actors = df_director['Cast'].value_counts().head(3).index.tolist()
+    top_actors = [actor for actor, _ in index.top_actors(director, TOP_ACTORS)]
 
     # Create a plot for each director
-    plt.figure(figsize=(10, 6))
+    fig = plt.figure(figsize=(10, 6))
 
     for actor in top_actors:
-        df_actor = df_director[df_director['Cast'] == actor].copy()
-
-        # Group by 5-year intervals
-        df_actor.loc[:, 'Year_Group'] = (df_actor['Year'] // 5) * 5
-        df_grouped = df_actor.groupby('Year_Group').size()
+        # Films together per interval
+        start, stop = pair_rows.get((director, actor), (0, 0))
 
         # Plotting
-        plt.plot(df_grouped.index, df_grouped.values, label=actor)
+        plt.plot(buckets[start:stop], films[start:stop], label=actor)
 
-    plt.xlabel('5-Year Intervals')
+    plt.xlabel(f'{BUCKET_WIDTH}-Year Intervals')
     plt.ylabel('Number of Films')
-    plt.title(f'Film Counts for Top 3 Actors with {director}')
-    plt.legend()
+    plt.title(f'Film Counts for Top {TOP_ACTORS} Actors with {director}')
+    if top_actors:
+        plt.legend()
     plt.grid(True)
 
-    # Save the plot
-    plt.savefig(f'./output/shellys_request2/{director}_film_counts.png', dpi=300, bbox_inches='tight')
-    plt.show()
\ No newline at end of file
+    # Save the plot (one per director, so they are closed instead of shown)
+    file_name = str(director).replace(os.sep, '_')
+    plt.savefig(os.path.join(output_folder, f'{file_name}_film_counts.png'), dpi=300, bbox_inches='tight')
+    plt.close(fig)
+    if n % 100 == 0 or n == len(index.directors):
+        print(f"Saved plots for {n} of {len(index.directors)} directors")
@@ -1,8 +1,12 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
-import time
 import os
+import re
+import sys
+from urllib.parse import quote_plus
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.async_fetch import fetch_many
+from scraping.parsers import make_soup
 
 # IMDb URLs for the directors
 directors_imdb = {
@@ -24,16 +28,25 @@ headers = {
     'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
 }
 
-
-# Function to scrape awards data for a given director
-def scrape_imdb_awards(director, url):
-    print(f"Fetching awards for {director} from {url}...")
-    response = requests.get(url, headers=headers)
-    if response.status_code == 403:
-        print(f"Access forbidden for {director}, please check your headers or proxy settings.")
-        return []
-
-    soup = BeautifulSoup(response.text, 'html.parser')
+# All directors mode: every director in the movies dataset instead of the 12 above (their ids come from IMDb
+# name searches, so check director_ids.csv before trusting the awards of a common name)
+ALL_DIRECTORS = False
+MOVIES_FILE = './data/imdb-movies-dataset.csv'
+# director name -> IMDb nm id, filled from directors_imdb and IMDb name searches and kept between runs;
+# an empty id records a search with no matching person, so it is not searched again
+DIRECTOR_IDS_FILE = './output/director_ids.csv'
+# every scraped award row, appended batch by batch, and the directors already done (with or without awards)
+AWARDS_RAW_FILE = './output/director_awards_raw.csv'
+DONE_FILE = './output/director_awards_done.csv'
+RATE_LIMIT = 2.0        # requests per second over all connections
+BURST = 4
+MAX_CONCURRENCY = 8
+BATCH_SIZE = 100        # directors per batch between writes
+
+
+# Pulls the awards out of an awards page, kept apart from the fetch so it can run over saved pages
+def parse_imdb_awards(html, director):
+    soup = make_soup(html)
     awards_data = []
 
     # Find all awards listed
@@ -68,16 +81,120 @@ def scrape_imdb_awards(director, url):
     return awards_data
 
 
-def main():
-    all_awards_data = []
+def awards_url(nm_id):
+    return f"https://www.imdb.com/name/{nm_id}/awards/"
+
+
+def name_search_url(name):
+    return f"https://www.imdb.com/find/?q={quote_plus(name)}&s=nm&exact=true"
+
+
+def same_name(a, b):
+    return ' '.join(a.split()).casefold() == ' '.join(b.split()).casefold()
+
 
+# First person in an IMDb name search whose name is the one searched for, as an nm id
+def parse_name_search(html, name):
+    soup = make_soup(html)
+    for a_tag in soup.select('a[href*="/name/nm"]'):
+        match = re.search(r'/name/(nm\d+)', a_tag['href'])
+        if match and same_name(a_tag.get_text(strip=True), name):
+            return match.group(1)
+    return None
+
+
+def fetch_pages(urls):
+    return fetch_many(urls, rate=RATE_LIMIT, burst=BURST, concurrency=MAX_CONCURRENCY, headers=headers)
+
+
+def load_directors():
+    if ALL_DIRECTORS and os.path.exists(MOVIES_FILE):
+        directors = pd.read_csv(MOVIES_FILE, usecols=['Director'])['Director'].dropna().str.strip()
+        return list(dict.fromkeys(directors))
+    return list(directors_imdb)
+
+
+def resolve_director_ids(directors):
+    # the lookup table on disk answers most names; only the rest are searched on IMDb, and the answers are
+    # added to the table so the next run does not search them again (misses too, with an empty id)
+    if os.path.exists(DIRECTOR_IDS_FILE):
+        ids = dict(pd.read_csv(DIRECTOR_IDS_FILE, dtype=str, keep_default_na=False).itertuples(index=False, name=None))
+    else:
+        ids = {}
     for director, url in directors_imdb.items():
-        director_awards = scrape_imdb_awards(director, url)
-        all_awards_data.extend(director_awards)
-        time.sleep(2)  # Delay to avoid being blocked
+        if not ids.get(director):
+            ids[director] = re.search(r'(nm\d+)', url).group(1)
+
+    missing = [director for director in directors if director not in ids]
+    if missing:
+        print(f"Looking up IMDb ids for {len(missing)} directors...")
+        for start in range(0, len(missing), BATCH_SIZE):
+            batch = missing[start:start + BATCH_SIZE]
+            pages = fetch_pages([name_search_url(director) for director in batch])
+            for director in batch:
+                status, html = pages[name_search_url(director)]
+                if html is None or status != 200:
+                    # not recorded, so the next run searches this director again
+                    print(f"Failed to search IMDb for {director} (status {status})")
+                    continue
+                ids[director] = parse_name_search(html, director) or ''
+                if not ids[director]:
+                    print(f"No IMDb person named {director}")
+            pd.DataFrame(list(ids.items()), columns=['Director', 'Id']).to_csv(DIRECTOR_IDS_FILE, index=False)
+    return {director: ids[director] for director in directors if ids.get(director)}
+
+
+def drop_unfinished_awards(done):
+    # award rows are appended before their directors reach the done file, so a run stopped between the two
+    # writes leaves rows for directors that will be scraped again; they are dropped before resuming so those
+    # awards are not counted twice
+    if not os.path.exists(AWARDS_RAW_FILE):
+        return
+    awards = pd.read_csv(AWARDS_RAW_FILE)
+    finished = awards['Director'].isin(done)
+    if not finished.all():
+        print(f"Dropping {(~finished).sum()} award rows of directors not marked as done")
+        awards[finished].to_csv(AWARDS_RAW_FILE + '.tmp', index=False)
+        os.replace(AWARDS_RAW_FILE + '.tmp', AWARDS_RAW_FILE)
+
+
+def scrape_all_awards(director_ids):
+    # awards pages are fetched a batch at a time over one pooled session; after every batch the award rows
+    # and the finished directors are appended to disk, so an interrupted run picks up where it stopped
+    done = set(pd.read_csv(DONE_FILE)['Director']) if os.path.exists(DONE_FILE) else set()
+    drop_unfinished_awards(done)
+    todo = [(director, nm_id) for director, nm_id in director_ids.items() if director not in done]
+    print(f"{len(director_ids)} directors, {len(done)} already scraped, {len(todo)} to go")
+
+    for start in range(0, len(todo), BATCH_SIZE):
+        batch = todo[start:start + BATCH_SIZE]
+        pages = fetch_pages([awards_url(nm_id) for _, nm_id in batch])
+        batch_awards = []
+        finished = []
+        for director, nm_id in batch:
+            status, html = pages[awards_url(nm_id)]
+            if html is None or status != 200:
+                # left out of the done file, so the next run tries this director again
+                print(f"Failed to fetch awards for {director} (status {status})")
+                continue
+            batch_awards.extend(parse_imdb_awards(html, director))
+            finished.append((director, nm_id))
+        if batch_awards:
+            pd.DataFrame(batch_awards).to_csv(AWARDS_RAW_FILE, mode='a', index=False,
+                                              header=not os.path.exists(AWARDS_RAW_FILE))
+        pd.DataFrame(finished, columns=['Director', 'Id']).to_csv(DONE_FILE, mode='a', index=False,
+                                                                 header=not os.path.exists(DONE_FILE))
+        print(f"Scraped awards for {start + len(batch)} of {len(todo)} directors")
+
+    return pd.read_csv(AWARDS_RAW_FILE) if os.path.exists(AWARDS_RAW_FILE) else pd.DataFrame()
 
-    # Convert the scraped data into a DataFrame
-    awards_df = pd.DataFrame(all_awards_data)
+
+def main():
+    os.makedirs('./output', exist_ok=True)
+    directors = load_directors()
+    director_ids = resolve_director_ids(directors)
+    awards_df = scrape_all_awards(director_ids)
+    awards_df = awards_df[awards_df['Director'].isin(directors)] if 'Director' in awards_df.columns else awards_df
 
     # Debugging: Print the first few rows of the DataFrame to verify its structure
     print(awards_df.head())
@@ -87,7 +204,6 @@ def main():
         awards_grouped = awards_df.groupby(['Director', 'Year']).size().reset_index(name='Film_Count')
 
         # Step 2: Save the list to a CSV file
-        os.makedirs('./output', exist_ok=True)
         awards_grouped.to_csv('./output/director_awards_list.csv', index=False)
         print("Scraping complete. Data saved to './output/director_awards_list.csv'")
     else:
@@ -1,43 +1,27 @@
 import pandas as pd
-import ast
 import matplotlib.pyplot as plt
+from title_index import match_titles
+from collab_store import collaboration_movies
 
 # Load the datasets
-frequent_collab_df = pd.read_csv('./output/frequent_director_actor_collaborations.csv')
-non_frequent_collab_df = pd.read_csv('./output/non_frequent_director_actor_collaborations.csv')
+# the collaborations come from the columnar store written by Actress_actor_relations.py (see collab_store.py)
 box_office_df = pd.read_csv('./data/top_10_box_office_movies_1977_2023.csv')
 
 # Clean the 'Gross' field in the box office dataset to remove dollar signs and commas, and convert to numeric
 box_office_df['Gross'] = box_office_df['Gross'].replace({'\$': '', ',': ''}, regex=True).astype(float)
 
-# Step 1: Filter frequent collaborations where the movies are in the top box office
-frequent_in_box_office = []
-for i, row in frequent_collab_df.iterrows():
-    director = row['Director']
-    for movie in ast.literal_eval(row['Movies']):
-        movie_match = box_office_df[box_office_df['Title'].str.contains(movie, case=False, na=False, regex=False)]
-        if not movie_match.empty:
-            for _, matched_row in movie_match.iterrows():
-                frequent_in_box_office.append({'Director': director, 'Title': matched_row['Title'], 'Gross': matched_row['Gross'], 'Frequent': True})
-
-# Convert to dataframe
-frequent_in_box_office_df = pd.DataFrame(frequent_in_box_office)
-
-# Step 2: Find non-frequent collaborations that are in the top box office
-non_frequent_in_box_office = []
-for i, row in non_frequent_collab_df.iterrows():
-    director = row['Director']
-    for movie in ast.literal_eval(row['Movies']):
-        movie_match = box_office_df[box_office_df['Title'].str.contains(movie, case=False, na=False, regex=False)]
-        if not movie_match.empty:
-            for _, matched_row in movie_match.iterrows():
-                non_frequent_in_box_office.append({'Director': director, 'Title': matched_row['Title'], 'Gross': matched_row['Gross'], 'Frequent': False})
-
-# Convert to dataframe
-non_frequent_in_box_office_df = pd.DataFrame(non_frequent_in_box_office)
+# Step 1: One row per collaboration and movie, frequent and non-frequent together, with the movie's year
+# so a title is only matched against box office titles from around the same year
+collab_movies_df = collaboration_movies()
+
+# Step 2: Match the movies against the box office titles on their normalized titles (see title_index.py)
+# every distinct title is matched once and the matches are merged back onto the collaborations
+movies = collab_movies_df[['Movies', 'Year']].drop_duplicates()
+title_matches = match_titles(movies, box_office_df[['Title', 'Year', 'Gross']], left_on='Movies', right_on='Title',
+                             left_year='Year', right_year='Year')
 
 # Step 3: Combine the datasets (frequent and non-frequent)
-combined_box_office_df = pd.concat([frequent_in_box_office_df, non_frequent_in_box_office_df], ignore_index=True)
+combined_box_office_df = collab_movies_df.merge(title_matches, on=['Movies', 'Year'])[['Director', 'Title', 'Gross', 'Frequent']]
 
 # Step 4: Filter the directors who have at least 2 frequent movies and 1 non-frequent movie in the box office
 director_movie_counts = combined_box_office_df.groupby(['Director', 'Frequent']).size().unstack(fill_value=0)
@@ -1,7 +1,7 @@
 import os
 import pandas as pd
-import networkx as nx
-from sklearn.cluster import SpectralClustering
+from spectral import bipartite_adjacency, spectral_clusters
+from graph_layout import cached_layout, draw_edges
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -9,54 +9,46 @@ os.makedirs('./output', exist_ok=True)
 
 data = pd.read_csv('./data/imdb-movies-dataset.csv')
 
-director_counts = data['Director'].value_counts()
-directors = director_counts[director_counts >= 20].index
-
-B = nx.Graph()
-B.add_nodes_from(directors, bipartite=0)
-actors = set(actor for cast in data['Cast'].dropna() for actor in cast.split(', '))
-B.add_nodes_from(actors, bipartite=1)
-
-for director, cast in zip(data['Director'], data['Cast']):
-    if pd.notna(cast) and director in directors:
-        B.add_edges_from((director, actor) for actor in cast.split(', ') if actor != director)
-
-top_directors = sorted(directors, key=lambda x: B.degree(x), reverse=True)
-top_actors = set(actor for director in top_directors for actor in B.neighbors(director))
-
-subgraph = B.subgraph(top_directors + list(top_actors))
-print(f"Subgraph has {subgraph.number_of_nodes()} nodes and {subgraph.number_of_edges()} edges")
-
-if subgraph.number_of_nodes() and subgraph.number_of_edges():
-    adj_matrix = nx.adjacency_matrix(subgraph)
-    labels = SpectralClustering(n_clusters=5, affinity='precomputed', random_state=42).fit_predict(adj_matrix.toarray())
-
-    pos = nx.spring_layout(subgraph, seed=42, k=0.1)
-    plt.figure(figsize=(14, 12))
-
-    director_positions = {node: pos[node] for node in top_directors}
-    actor_positions = {node: pos[node] for node in top_actors}
+# Directors with at least MIN_FILMS films and their actors, as a sparse adjacency (see spectral.py);
+# set N_CLUSTERS = None to pick the number of clusters from the eigengap instead
+MIN_FILMS = 20
+N_CLUSTERS = 5
+adjacency, top_directors, top_actors = bipartite_adjacency(data, MIN_FILMS)
+top_directors, top_actors = list(top_directors), list(top_actors)
+print(f"Subgraph has {adjacency.shape[0]} nodes and {adjacency.nnz // 2} edges")
+
+if adjacency.shape[0] and adjacency.nnz:
+    labels, n_clusters, eigenvalues, vectors = spectral_clusters(adjacency, N_CLUSTERS)
+    print(f"{n_clusters} clusters (smallest Laplacian eigenvalues: {np.round(eigenvalues[:n_clusters + 2], 3)})")
+    pd.DataFrame({'Name': top_directors + top_actors,
+                  'Role': ['Director'] * len(top_directors) + ['Actor'] * len(top_actors),
+                  'Cluster': labels}).to_csv('./output/directors_actors_clusters.csv', index=False)
+
+    # layout seeded from the spectral embedding and cached per graph (see graph_layout.py), so restyling the
+    # figure does not lay the graph out again; nodes are drawn per cluster through boolean masks
+    pos = cached_layout(adjacency, vectors)
+    is_director = np.arange(adjacency.shape[0]) < len(top_directors)
+    fig, ax = plt.subplots(figsize=(14, 12))
 
     unique_labels = np.unique(labels)
-    colors = plt.cm.tab10(unique_labels)
+    # one color per cluster: N_CLUSTERS = None can pick up to 20 clusters, more than tab10 has (and a fixed
+    # N_CLUSTERS above 20 gets evenly spaced hues)
+    colors = plt.get_cmap('tab20' if n_clusters <= 20 else 'hsv', max(n_clusters, 2))(unique_labels)
 
     for label, color in zip(unique_labels, colors):
-        director_cluster = [node for node, lab in zip(subgraph.nodes(), labels) if
-                            lab == label and node in top_directors]
-        actor_cluster = [node for node, lab in zip(subgraph.nodes(), labels) if lab == label and node in top_actors]
-
-        if director_cluster:
-            plt.scatter(*zip(*[pos[node] for node in director_cluster]), s=500, color=color, edgecolors='k')
-        if actor_cluster:
-            plt.scatter(*zip(*[pos[node] for node in actor_cluster]), s=50, color=color, alpha=0.6)
+        in_cluster = labels == label
+        if (in_cluster & is_director).any():
+            ax.scatter(*pos[in_cluster & is_director].T, s=500, color=[color], edgecolors='k', zorder=3)
+        if (in_cluster & ~is_director).any():
+            ax.scatter(*pos[in_cluster & ~is_director].T, s=50, color=[color], alpha=0.6, zorder=2)
 
-    nx.draw_networkx_edges(subgraph, pos, alpha=0.5)
+    draw_edges(ax, adjacency, pos, colors='k', linewidths=1, alpha=0.5, zorder=1)
 
-    for director in top_directors:
-        plt.text(pos[director][0], pos[director][1] + 0.03, director, fontsize=10, ha='center', va='bottom',
-                 fontweight='bold', bbox=dict(facecolor='white', alpha=0.5, edgecolor='none'))
+    for director, (x, y) in zip(top_directors, pos[is_director]):
+        ax.text(x, y + 0.03, director, fontsize=10, ha='center', va='bottom', fontweight='bold', zorder=4,
+                bbox=dict(facecolor='white', alpha=0.5, edgecolor='none'))
 
-    plt.title('Top 10 Directors-Actor Connections with Clustering')
+    plt.title(f'Directors with {MIN_FILMS}+ Films and Their Actors, {n_clusters} Spectral Clusters')
     plt.xlabel('')
     plt.ylabel('')
     plt.savefig('./output/directors_actors_clustering.png')
@@ -0,0 +1,61 @@
+# time-bucketed cubes: one groupby over every director (and actor) at once instead of a (Year // 5) * 5 groupby
+# per director inside the plotting loops
+#   films cube:  Director, Actor, Bucket, Films  - films each director-actor pair made in each bucket
+#   awards cube: Director, Bucket, Awards        - awards per director per bucket (p2b's director_awards_list.csv)
+# Bucket is the first year of a `width`-year bucket; cubes are stored as Feather next to the collaboration store,
+# one file per kind and width (e.g. films_cube_5y.feather), sorted so a director's rows are one contiguous slice
+import os
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+from collab_edges import director_actor_edges
+from collab_store import STORE_DIR, table_path
+
+BUCKET_WIDTH = 5
+
+
+def cube_path(kind, width=BUCKET_WIDTH, store_dir=STORE_DIR):
+    return table_path(f'{kind}_cube_{width}y', store_dir)
+
+
+def add_bucket(df, width=BUCKET_WIDTH, year_column='Year'):
+    # rows without a usable year are dropped, as the per-director groupby did
+    years = pd.to_numeric(df[year_column], errors='coerce')
+    df = df[years.notna()]
+    return df.assign(Bucket=((years[years.notna()] // width) * width).astype(np.int16))
+
+
+def films_cube(movies_df, width=BUCKET_WIDTH):
+    credits, _ = director_actor_edges(movies_df, columns=['Year'], drop_self=False)
+    credits = add_bucket(credits.rename(columns={'Cast': 'Actor'}), width)
+    cube = credits.groupby(['Director', 'Actor', 'Bucket']).size().rename('Films').reset_index()
+    return cube.astype({'Director': 'category', 'Actor': 'category', 'Films': np.int32})
+
+
+def awards_cube(awards_df, width=BUCKET_WIDTH):
+    awards = add_bucket(awards_df.dropna(subset=['Director']), width)
+    cube = awards.groupby(['Director', 'Bucket'])['Film_Count'].sum().rename('Awards').reset_index()
+    return cube.astype({'Director': 'category', 'Awards': np.int32})
+
+
+def save_cube(cube, kind, width=BUCKET_WIDTH, store_dir=STORE_DIR):
+    os.makedirs(store_dir, exist_ok=True)
+    feather.write_feather(cube, cube_path(kind, width, store_dir), compression='uncompressed')
+
+
+def load_cube(kind, width=BUCKET_WIDTH, store_dir=STORE_DIR):
+    return feather.read_table(cube_path(kind, width, store_dir), memory_map=True).to_pandas()
+
+
+def cube_ranges(cube, keys):
+    # {key: (start, stop)} for a cube sorted on `keys` (a column name or a list of them), so the rows of one
+    # director or one pair are cube.iloc[start:stop] without filtering the whole cube
+    columns = [keys] if isinstance(keys, str) else list(keys)
+    values = [cube[column].to_numpy() for column in columns]
+    changed = np.zeros(max(len(cube) - 1, 0), dtype=bool)
+    for column in values:
+        changed |= column[1:] != column[:-1]
+    starts = np.flatnonzero(np.r_[True, changed]) if len(cube) else np.empty(0, dtype=int)
+    stops = np.r_[starts[1:], len(cube)]
+    names = zip(*[column[starts] for column in values]) if len(columns) > 1 else values[0][starts]
+    return dict(zip(names, zip(starts.tolist(), stops.tolist())))
@@ -0,0 +1,15 @@
+# the exploded cast table every director-actor view is built from: one row per actor credited on a movie
+# (Cast split on ', '), keeping the movie's row index so callers can join back to the dataset, in dataset order
+
+
+def director_actor_edges(data, min_films=1, columns=(), drop_self=True):
+    # one row per (Director, Cast) credit for the directors with at least min_films films, plus any extra columns
+    # (e.g. 'Year'); rows without a director or a cast are left out, and so is a director listed in their own cast
+    # unless drop_self=False. returns (edges, directors)
+    director_counts = data['Director'].value_counts()
+    directors = director_counts[director_counts >= min_films].index
+    edges = data.loc[data['Director'].isin(directors) & data['Cast'].notna(), ['Director', 'Cast', *columns]]
+    edges = edges.assign(Cast=edges['Cast'].str.split(', ')).explode('Cast')
+    if drop_self:
+        edges = edges[edges['Cast'] != edges['Director']]
+    return edges, directors
@@ -0,0 +1,128 @@
+# in-memory inverted index over the exploded cast table (one row per actor credited on a movie)
+# built once with a few sorts, then every query is a slice of contiguous numpy arrays (CSR style):
+#   by director: the director's credits sorted by year, and the director's actors sorted by films together
+#   by actor:    the actor's credits sorted by year, and the actor's directors sorted by films together
+#   by pair:     the years of one director-actor pair, sorted
+# so "top actors of D", "directors of A" and "films per 5 years" cost a dictionary lookup and a slice
+import numpy as np
+import pandas as pd
+from collab_edges import director_actor_edges
+
+
+def csr_order(keys, n_keys, *sort_keys):
+    # row order grouping `keys` together (then by the sort_keys, last one first as in np.lexsort) and the
+    # indptr array: rows of key i are order[indptr[i]:indptr[i + 1]]
+    order = np.lexsort(sort_keys + (keys,))
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(keys, minlength=n_keys))])
+    return order, indptr
+
+
+def bucket_counts(years, width=5):
+    # (bucket start years, credits per bucket) for sorted years; missing years are left out
+    years = years[~np.isnan(years)]
+    buckets, counts = np.unique((years // width) * width, return_counts=True)
+    return buckets.astype(int), counts
+
+
+class CollabIndex:
+    def __init__(self, director_codes, actor_codes, years, directors, actors):
+        # one entry per credit, in dataset order: codes into the directors / actors name arrays and the movie's year
+        # (NaN if unknown)
+        self.directors = np.asarray(directors)
+        self.actors = np.asarray(actors)
+        self.director_ids = {name: i for i, name in enumerate(self.directors)}
+        self.actor_ids = {name: i for i, name in enumerate(self.actors)}
+        director_codes = np.asarray(director_codes, dtype=np.int64)
+        actor_codes = np.asarray(actor_codes, dtype=np.int64)
+        years = np.asarray(years, dtype=float)
+
+        order, self.director_indptr = csr_order(director_codes, len(self.directors), years)
+        self.director_actor, self.director_year = actor_codes[order], years[order]
+        order, self.actor_indptr = csr_order(actor_codes, len(self.actors), years)
+        self.actor_director, self.actor_year = director_codes[order], years[order]
+
+        # pairs: one entry per (director, actor), with the credits of the pair as a run of sorted years
+        order = np.lexsort((years, actor_codes, director_codes))
+        pair_director, pair_actor = director_codes[order], actor_codes[order]
+        self.pair_year = years[order]
+        starts = np.flatnonzero(np.r_[True, (np.diff(pair_director) != 0) | (np.diff(pair_actor) != 0)])
+        if len(order) == 0:
+            starts = starts[:0]
+        self.pair_indptr = np.r_[starts, len(order)]
+        pair_director, pair_actor = pair_director[starts], pair_actor[starts]
+        self.pair_count = np.diff(self.pair_indptr)
+        self.pair_ids = dict(zip(zip(pair_director.tolist(), pair_actor.tolist()), range(len(starts))))
+        first_credit = np.minimum.reduceat(order, starts) if len(starts) else starts
+
+        # each director's pairs by films together and the same per actor; ties go to the pair credited first in
+        # the dataset, the order value_counts leaves them in
+        order, self.director_pair_indptr = csr_order(pair_director, len(self.directors), first_credit, -self.pair_count)
+        self.director_pairs = order
+        order, self.actor_pair_indptr = csr_order(pair_actor, len(self.actors), first_credit, -self.pair_count)
+        self.actor_pairs = order
+        self.pair_director, self.pair_actor = pair_director, pair_actor
+
+    @classmethod
+    def from_movies(cls, movies_df):
+        # movies_df is the IMDb movies dataset (Director, Cast as "a, b, c", Year)
+        credits, _ = director_actor_edges(movies_df, columns=['Year'], drop_self=False)
+        years = pd.to_numeric(credits['Year'], errors='coerce').to_numpy(dtype=float)
+        director_codes, directors = pd.factorize(credits['Director'])
+        actor_codes, actors = pd.factorize(credits['Cast'])
+        return cls(director_codes, actor_codes, years, directors, actors)
+
+    @classmethod
+    def from_store(cls, store_dir=None):
+        # the same index from the columnar collaboration store (collab_store.py), without reparsing the csv
+        from collab_store import STORE_DIR, load_collab_table
+        store_dir = store_dir or STORE_DIR
+        edges = load_collab_table('edges', store_dir=store_dir)
+        movies = load_collab_table('movies', ['year'], store_dir)
+        years = movies['year'].to_numpy(dtype=float, na_value=np.nan)[edges['movie_id']]
+        directors = load_collab_table('directors', ['name'], store_dir)['name'].to_numpy()
+        actors = load_collab_table('actors', ['name'], store_dir)['name'].to_numpy()
+        return cls(edges['director_id'].to_numpy(), edges['actor_id'].to_numpy(), years, directors, actors)
+
+    def top_actors(self, director, k=3):
+        # [(actor, films together)], most frequent first
+        i = self.director_ids.get(director)
+        if i is None:
+            return []
+        pairs = self.director_pairs[self.director_pair_indptr[i]:self.director_pair_indptr[i + 1]][:k]
+        return list(zip(self.actors[self.pair_actor[pairs]], self.pair_count[pairs].tolist()))
+
+    def directors_for(self, actor, k=None):
+        # [(director, films together)], most frequent first
+        i = self.actor_ids.get(actor)
+        if i is None:
+            return []
+        pairs = self.actor_pairs[self.actor_pair_indptr[i]:self.actor_pair_indptr[i + 1]][:k]
+        return list(zip(self.directors[self.pair_director[pairs]], self.pair_count[pairs].tolist()))
+
+    def director_years(self, director):
+        i = self.director_ids.get(director)
+        if i is None:
+            return np.empty(0)
+        return self.director_year[self.director_indptr[i]:self.director_indptr[i + 1]]
+
+    def actor_years(self, actor):
+        i = self.actor_ids.get(actor)
+        if i is None:
+            return np.empty(0)
+        return self.actor_year[self.actor_indptr[i]:self.actor_indptr[i + 1]]
+
+    def pair_years(self, director, actor):
+        pair = self.pair_ids.get((self.director_ids.get(director), self.actor_ids.get(actor)))
+        if pair is None:
+            return np.empty(0)
+        return self.pair_year[self.pair_indptr[pair]:self.pair_indptr[pair + 1]]
+
+    def bucket_counts(self, director=None, actor=None, width=5):
+        # credits per `width`-year bucket of a director, an actor, or a director-actor pair
+        if director is not None and actor is not None:
+            years = self.pair_years(director, actor)
+        elif director is not None:
+            years = self.director_years(director)
+        else:
+            years = self.actor_years(actor)
+        return bucket_counts(years, width)
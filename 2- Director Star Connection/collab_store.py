@@ -0,0 +1,102 @@
+# columnar store for the director/actor collaborations, one Feather file per table under output/collab_store:
+#   directors (director_id, name), actors (actor_id, name), movies (movie_id, title, year)
+#   edges (director_id, actor_id, movie_id) - one row per actor credited on a movie, int32 keys
+# names and titles are dictionary-encoded; the files are written uncompressed so loading them is a memory map
+# of the Arrow buffers with no parsing at all, and a loader only touches the columns it asks for
+import os
+import numpy as np
+import pandas as pd
+import pyarrow.feather as feather
+from collab_edges import director_actor_edges
+
+STORE_DIR = './output/collab_store'
+TABLES = ('directors', 'actors', 'movies', 'edges')
+FREQUENT_MIN = 3        # films together for a director-actor pair to count as a frequent collaboration
+
+
+def table_path(name, store_dir=STORE_DIR):
+    return os.path.join(store_dir, f'{name}.feather')
+
+
+def build_collab_store(movies_df, store_dir=STORE_DIR):
+    # movies_df is the IMDb movies dataset (Director, Cast as "a, b, c", Title and optionally Year)
+    movies_df = movies_df[movies_df['Director'].notna()].reset_index(drop=True)
+    director_ids, director_names = pd.factorize(movies_df['Director'])
+
+    cast = director_actor_edges(movies_df, drop_self=False)[0]['Cast']
+    actor_ids, actor_names = pd.factorize(cast)
+    movie_ids = cast.index.to_numpy()
+
+    year = movies_df['Year'] if 'Year' in movies_df.columns else pd.Series(np.nan, index=movies_df.index)
+    tables = {
+        'directors': pd.DataFrame({'director_id': np.arange(len(director_names), dtype=np.int32),
+                                   'name': pd.Categorical(director_names)}),
+        'actors': pd.DataFrame({'actor_id': np.arange(len(actor_names), dtype=np.int32),
+                                'name': pd.Categorical(actor_names)}),
+        'movies': pd.DataFrame({'movie_id': np.arange(len(movies_df), dtype=np.int32),
+                                'title': pd.Categorical(movies_df['Title']),
+                                'year': pd.to_numeric(year, errors='coerce').astype('Int16')}),
+        'edges': pd.DataFrame({'director_id': director_ids[movie_ids].astype(np.int32),
+                               'actor_id': actor_ids.astype(np.int32),
+                               'movie_id': movie_ids.astype(np.int32)}),
+    }
+    os.makedirs(store_dir, exist_ok=True)
+    for name, table in tables.items():
+        feather.write_feather(table, table_path(name, store_dir), compression='uncompressed')
+    return tables
+
+
+def load_collab_table(name, columns=None, store_dir=STORE_DIR, as_arrow=False):
+    # as_arrow returns the memory-mapped pyarrow Table itself, without converting to pandas
+    table = feather.read_table(table_path(name, store_dir), columns=columns, memory_map=True)
+    return table if as_arrow else table.to_pandas()
+
+
+def collab_store_exists(store_dir=STORE_DIR):
+    return all(os.path.exists(table_path(name, store_dir)) for name in TABLES)
+
+
+def aggregate_collaborations(movies_df, frequent_min=FREQUENT_MIN):
+    # one row per (Director, Cast) pair with its film count, the list of titles and the frequent flag, in one
+    # sort-based pass over integer codes instead of a groupby().size() plus a groupby().apply(list) and two merges
+    # rows come out sorted by director and actor, titles in dataset order, like the groupby version
+    edges, _ = director_actor_edges(movies_df, columns=['Title'], drop_self=False)
+    director_codes, directors = pd.factorize(edges['Director'], sort=True)
+    actor_codes, actors = pd.factorize(edges['Cast'], sort=True)
+    titles = edges['Title'].to_numpy()
+
+    order = np.lexsort((actor_codes, director_codes))
+    director_codes, actor_codes, titles = director_codes[order], actor_codes[order], titles[order]
+
+    starts = np.flatnonzero(np.r_[True, (np.diff(director_codes) != 0) | (np.diff(actor_codes) != 0)])
+    if len(titles) == 0:
+        starts = starts[:0]
+    counts = np.diff(np.r_[starts, len(titles)])
+    return pd.DataFrame({
+        'Director': directors[director_codes[starts]],
+        'Cast': actors[actor_codes[starts]],
+        'Count': counts,
+        'Title': [chunk.tolist() for chunk in np.split(titles, starts[1:])],
+        'Frequent': counts >= frequent_min,
+    })
+
+
+def pair_counts(edges):
+    # films per director-actor pair, broadcast back onto every edge of that pair
+    return edges.groupby(['director_id', 'actor_id'])['movie_id'].transform('size')
+
+
+def collaboration_movies(store_dir=STORE_DIR, frequent_min=FREQUENT_MIN):
+    # one row per (director, actor, movie) with the director's name, the movie's title and year, and whether the
+    # pair is a frequent collaboration - the long form of the Movies lists in the collaboration csv files
+    edges = load_collab_table('edges', store_dir=store_dir)
+    edges['Frequent'] = pair_counts(edges) >= frequent_min
+    directors = load_collab_table('directors', ['name'], store_dir)['name']
+    movies = load_collab_table('movies', ['title', 'year'], store_dir)
+    return pd.DataFrame({
+        'Director': directors.to_numpy()[edges['director_id']],
+        'actor_id': edges['actor_id'],
+        'Movies': movies['title'].to_numpy()[edges['movie_id']],
+        'Year': movies['year'].to_numpy(dtype=float, na_value=np.nan)[edges['movie_id']],
+        'Frequent': edges['Frequent'],
+    })
@@ -0,0 +1,125 @@
+# force-directed layout for the large clustering graphs, replacing nx.spring_layout
+# Fruchterman-Reingold forces, but the repulsion is approximated Barnes-Hut style: nodes are binned on a grid and
+# every node is pushed by the cells (their node count at their centroid) instead of by every other node, so an
+# iteration costs nodes x cells instead of nodes x nodes. Attraction runs over the sparse edge list in one pass
+# the layout starts from the spectral embedding the clustering already computed, so it only needs a few
+# iterations to untangle, and it is cached on disk under the hash of the graph and the settings: drawing the
+# same graph again (e.g. with new colors) loads the positions instead of recomputing them
+import os
+import hashlib
+import numpy as np
+import scipy.sparse as sp
+from matplotlib.collections import LineCollection
+
+LAYOUT_CACHE = './output/layout_cache'
+ITERATIONS = 50
+GRID_SIZE = 32          # cells per side for the repulsion
+NODE_BLOCK = 4096       # nodes whose repulsion is computed at once
+
+
+def graph_hash(adjacency, *extra):
+    # content hash of the sparse structure and weights plus anything else the layout depends on
+    adjacency = sp.csr_matrix(adjacency)
+    adjacency.sort_indices()
+    digest = hashlib.sha1()
+    digest.update(repr(adjacency.shape).encode())
+    for array in (adjacency.indptr, adjacency.indices, adjacency.data):
+        digest.update(np.ascontiguousarray(array).tobytes())
+    for value in extra:
+        digest.update(np.ascontiguousarray(value).tobytes() if isinstance(value, np.ndarray) else repr(value).encode())
+    return digest.hexdigest()
+
+
+def rescale(pos):
+    # centered on 0 and scaled into [-1, 1], like networkx's layouts
+    pos = pos - pos.mean(axis=0)
+    extent = np.abs(pos).max()
+    return pos / extent if extent > 0 else pos
+
+
+def initial_positions(embedding, seed=42):
+    # the first two non-trivial eigenvectors, plus a little jitter: nodes with the same neighbours (actors who
+    # only worked with one director) have identical spectral coordinates and would never separate
+    pos = np.asarray(embedding, dtype=float)[:, 1:3]
+    if pos.shape[1] < 2:
+        pos = np.column_stack([pos, np.zeros((len(pos), 2 - pos.shape[1]))])
+    pos = (rescale(pos) + 1) / 2
+    return pos + np.random.default_rng(seed).uniform(-1e-3, 1e-3, pos.shape)
+
+
+def grid_repulsion(pos, k, grid_size=GRID_SIZE):
+    # k^2 / d from every cell's centroid, weighted by the cell's node count; a node's own cell is taken without it
+    low = pos.min(axis=0)
+    span = np.maximum(pos.max(axis=0) - low, 1e-9)
+    cell_xy = np.minimum(((pos - low) / span * grid_size).astype(int), grid_size - 1)
+    cells = cell_xy[:, 0] * grid_size + cell_xy[:, 1]
+    mass = np.bincount(cells, minlength=grid_size ** 2).astype(float)
+    sums = np.column_stack([np.bincount(cells, pos[:, axis], minlength=grid_size ** 2) for axis in (0, 1)])
+    occupied = mass > 0
+    mass, sums, cells = mass[occupied], sums[occupied], np.cumsum(occupied)[cells] - 1
+    centroids = sums / mass[:, None]
+    softening = (k / 10) ** 2
+
+    force = np.empty_like(pos)
+    for start in range(0, len(pos), NODE_BLOCK):
+        block = pos[start:start + NODE_BLOCK]
+        delta = block[:, None, :] - centroids[None, :, :]
+        distance2 = (delta ** 2).sum(axis=2) + softening
+        push = delta * (mass / distance2)[:, :, None]
+        # swap the node's own cell for that cell without the node
+        own = cells[start:start + NODE_BLOCK]
+        rows = np.arange(len(block))
+        others = mass[own] - 1
+        own_centroid = (sums[own] - block) / np.maximum(others, 1)[:, None]
+        own_delta = block - own_centroid
+        own_push = own_delta * (others / ((own_delta ** 2).sum(axis=1) + softening))[:, None]
+        force[start:start + NODE_BLOCK] = push.sum(axis=1) - push[rows, own] + own_push
+    return force * k ** 2
+
+
+def edge_attraction(pos, edges, weights, k):
+    # d^2 / k along every edge, accumulated per node with bincount
+    rows, cols = edges
+    delta = pos[rows] - pos[cols]
+    pull = delta * (np.sqrt((delta ** 2).sum(axis=1)) * weights / k)[:, None]
+    force = np.zeros_like(pos)
+    for axis in (0, 1):
+        force[:, axis] = (np.bincount(cols, pull[:, axis], minlength=len(pos))
+                          - np.bincount(rows, pull[:, axis], minlength=len(pos)))
+    return force
+
+
+def force_layout(adjacency, init, iterations=ITERATIONS, k=None, grid_size=GRID_SIZE):
+    # returns positions in [-1, 1]; init is an (n, 2) start in the unit square (see initial_positions)
+    adjacency = sp.triu(sp.csr_matrix(adjacency), k=1).tocoo()
+    pos = np.array(init, dtype=float)
+    k = k or 1 / np.sqrt(max(len(pos), 1))
+    edges, weights = (adjacency.row, adjacency.col), adjacency.data.astype(float)
+    temperature = 0.1
+    for _ in range(iterations):
+        force = grid_repulsion(pos, k, grid_size) + edge_attraction(pos, edges, weights, k)
+        length = np.maximum(np.sqrt((force ** 2).sum(axis=1)), 1e-9)
+        pos += force * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= 0.1 / (iterations + 1)
+    return rescale(pos)
+
+
+def cached_layout(adjacency, embedding, iterations=ITERATIONS, k=None, seed=42, cache_dir=LAYOUT_CACHE):
+    # the positions for this graph and these settings from the cache, computed and saved on a miss
+    init = initial_positions(embedding, seed)
+    path = os.path.join(cache_dir, f'{graph_hash(adjacency, init, iterations, k, GRID_SIZE)}.npy')
+    if os.path.exists(path):
+        return np.load(path)
+    pos = force_layout(adjacency, init, iterations, k)
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path, pos)
+    return pos
+
+
+def draw_edges(ax, adjacency, pos, **style):
+    # all edges as one LineCollection instead of one line per edge
+    adjacency = sp.triu(sp.csr_matrix(adjacency), k=1).tocoo()
+    segments = np.stack([pos[adjacency.row], pos[adjacency.col]], axis=1)
+    lines = LineCollection(segments, **style)
+    ax.add_collection(lines)
+    return lines
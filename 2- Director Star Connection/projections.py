@@ -0,0 +1,105 @@
+# one-mode projections of the director-actor graph as sparse matrix products:
+#   directors linked by the actors they share (B @ B.T), actors linked by the directors they share (B.T @ B)
+# B is the director x actor biadjacency (1 per pair that worked together, or the number of films with counts=True)
+# the product is computed a block of rows at a time and pruned to each row's top_k strongest links before the
+# next block, so the full projection of every actor in the dataset is never held in memory
+#   python projections.py [top_k]
+import os
+import sys
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from collab_edges import director_actor_edges
+
+TOP_K = 50              # strongest links kept per node
+BLOCK_ROWS = 2048       # rows of the product computed at once
+NORMALIZATIONS = (None, 'jaccard', 'overlap')
+
+
+def biadjacency(data, min_films=1, counts=False):
+    # returns (B, director names, actor names); directors with fewer than min_films films are left out
+    edges, _ = director_actor_edges(data, min_films, drop_self=False)
+    director_codes, directors = pd.factorize(edges['Director'], sort=True)
+    actor_codes, actors = pd.factorize(edges['Cast'], sort=True)
+    B = sp.csr_matrix((np.ones(len(edges), dtype=np.float32), (director_codes, actor_codes)),
+                      shape=(len(directors), len(actors)))
+    if not counts:
+        B.data[:] = 1
+    return B, np.asarray(directors), np.asarray(actors)
+
+
+def top_k_rows(block, top_k):
+    # keeps the top_k largest entries of every row of a CSR block (ties broken by column)
+    block = block.tocoo()
+    order = np.lexsort((block.col, -block.data, block.row))
+    rows = block.row[order]
+    starts = np.searchsorted(rows, rows, side='left')
+    keep = order[np.arange(len(rows)) - starts < top_k]
+    return sp.csr_matrix((block.data[keep], (block.row[keep], block.col[keep])), shape=block.shape)
+
+
+def normalized(weights, first, second, normalize):
+    if normalize == 'jaccard':
+        return weights / (first + second - weights)
+    if normalize == 'overlap':
+        return weights / np.minimum(first, second)
+    return weights
+
+
+def project(B, top_k=TOP_K, normalize=None, min_weight=0, block_rows=BLOCK_ROWS):
+    # projection onto B's rows (pass B.T for the columns): weight of (i, j) is B[i] . B[j], i.e. the number of
+    # shared neighbours for a 0/1 B, divided by
+    #   'jaccard'  the size of the union:          w / (w_ii + w_jj - w)
+    #   'overlap'  the smaller neighbourhood:      w / min(w_ii, w_jj)
+    # self links are dropped; top_k=None keeps every link
+    if normalize not in NORMALIZATIONS:
+        raise ValueError(f"normalize must be one of {NORMALIZATIONS}")
+    B = sp.csr_matrix(B, dtype=np.float32)
+    BT = B.T.tocsc()
+    self_weight = np.asarray(B.multiply(B).sum(axis=1)).ravel()
+    blocks = []
+    for start in range(0, B.shape[0], block_rows):
+        block = (B[start:start + block_rows] @ BT).tocoo()
+        rows = block.row + start
+        off_diagonal = (rows != block.col) & (block.data > min_weight)
+        rows, cols, weights = rows[off_diagonal], block.col[off_diagonal], block.data[off_diagonal]
+        weights = normalized(weights, self_weight[rows], self_weight[cols], normalize)
+        block = sp.csr_matrix((weights, (rows - start, cols)), shape=(block.shape[0], B.shape[0]))
+        blocks.append(top_k_rows(block, top_k) if top_k else block)
+    if not blocks:
+        return sp.csr_matrix((B.shape[0], B.shape[0]), dtype=np.float32)
+    return sp.vstack(blocks, format='csr')
+
+
+def edge_table(projection, names):
+    # one row per undirected link (Source < Target in node order); a link survives the top_k pruning when
+    # either end kept it
+    projection = projection.maximum(projection.T).tocoo()
+    upper = projection.row < projection.col
+    names = np.asarray(names)
+    return pd.DataFrame({
+        'Source': names[projection.row[upper]],
+        'Target': names[projection.col[upper]],
+        'Weight': projection.data[upper],
+    }).sort_values(['Source', 'Weight'], ascending=[True, False], ignore_index=True)
+
+
+def main(top_k=TOP_K):
+    os.makedirs('./output', exist_ok=True)
+    data = pd.read_csv('./data/imdb-movies-dataset.csv')
+    B, directors, actors = biadjacency(data)
+    print(f"{len(directors)} directors x {len(actors)} actors, {B.nnz} pairs")
+
+    # links are picked on the shared count, then both normalizations are reported for the same links
+    for name, matrix, names in (('director', B, directors), ('actor', B.T.tocsr(), actors)):
+        edges = edge_table(project(matrix, top_k), names).rename(columns={'Weight': 'Shared'})
+        self_weight = pd.Series(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel(), index=names)
+        first, second = self_weight[edges['Source']].to_numpy(), self_weight[edges['Target']].to_numpy()
+        for normalize in NORMALIZATIONS[1:]:
+            edges[normalize.capitalize()] = normalized(edges['Shared'].to_numpy(), first, second, normalize)
+        edges.to_csv(f'./output/{name}_projection.csv', index=False)
+        print(f"{name} projection: {len(edges)} links saved to ./output/{name}_projection.csv")
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else TOP_K)
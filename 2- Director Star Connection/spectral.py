@@ -0,0 +1,92 @@
+# sparse spectral clustering for the director-actor graph
+# the adjacency is built straight from the exploded cast table as a scipy CSR matrix (no networkx, nothing dense),
+# the embedding comes from a partial eigensolver on the normalized adjacency, and the number of clusters can be
+# picked from the largest gap in the normalized Laplacian's spectrum
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.linalg import eigsh
+from sklearn.cluster import KMeans
+from collab_edges import director_actor_edges
+
+
+def bipartite_adjacency(data, min_films=20):
+    # directors with at least min_films films and every actor they worked with, one node per name as in the
+    # networkx graph this replaces (a director who acts for another director is a single node); node order is the
+    # directors by degree (most connected first) followed by the other actors
+    # returns (adjacency, director names, actor names)
+    edges, directors = director_actor_edges(data, min_films)
+    edges = edges.drop_duplicates()
+
+    degree = edges['Director'].value_counts()
+    degree = pd.concat([edges['Cast'][edges['Cast'].isin(directors)].value_counts(), degree]).groupby(level=0).sum()
+    director_names = degree.reindex(directors, fill_value=0).sort_values(ascending=False, kind='stable').index
+    actor_names = pd.Index(edges['Cast'].unique()).difference(director_names, sort=False)
+    nodes = director_names.append(actor_names)
+
+    rows = nodes.get_indexer(edges['Director'])
+    cols = nodes.get_indexer(edges['Cast'])
+    half = sp.csr_matrix((np.ones(len(edges), dtype=np.float32), (rows, cols)), shape=(len(nodes), len(nodes)))
+    # two directors in each other's casts are still one edge
+    adjacency = ((half + half.T) > 0).astype(np.float32).tocsr()
+    return adjacency, np.asarray(director_names), np.asarray(actor_names)
+
+
+def normalized_adjacency(adjacency):
+    # D^-1/2 A D^-1/2; the normalized Laplacian is I minus this, so its smallest eigenvalues are 1 minus the
+    # largest ones here. isolated nodes keep a zero row
+    degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    scale = np.zeros_like(degree, dtype=np.float64)
+    scale[degree > 0] = 1 / np.sqrt(degree[degree > 0])
+    scale = sp.diags(scale)
+    return (scale @ adjacency @ scale).tocsr()
+
+
+def normalized_laplacian(adjacency):
+    return sp.identity(adjacency.shape[0], format='csr') - normalized_adjacency(adjacency)
+
+
+def spectral_embedding(adjacency, n_vectors, random_state=42, v0=None):
+    # the n_vectors smallest eigenpairs of the normalized Laplacian, ascending
+    # v0 is the eigensolver's start vector; one close to the wanted eigenvectors (e.g. the previous embedding of
+    # a slightly changed graph) cuts the number of iterations
+    n_vectors = min(n_vectors, adjacency.shape[0] - 1)
+    if v0 is None:
+        v0 = np.random.default_rng(random_state).uniform(-1, 1, adjacency.shape[0])
+    values, vectors = eigsh(normalized_adjacency(adjacency), k=n_vectors, which='LA', v0=v0)
+    order = np.argsort(-values)
+    return 1 - values[order], vectors[:, order]
+
+
+def eigengap_clusters(eigenvalues, min_clusters=2, drop_ones=False):
+    # k is where the next eigenvalue jumps the most: eigenvalues[k] - eigenvalues[k - 1]
+    # drop_ones leaves the eigenvalues of 1 out: a director-actor graph has at most one non-trivial eigenvalue per
+    # director, and with few directors (a short time window) the step up to the 1s would otherwise always win
+    if drop_ones:
+        eigenvalues = eigenvalues[eigenvalues < 1 - 1e-6]
+    gaps = np.diff(eigenvalues)[min_clusters - 1:]
+    return int(np.argmax(gaps) + min_clusters) if len(gaps) else min_clusters
+
+
+def spectral_clusters(adjacency, n_clusters=None, max_clusters=20, random_state=42, v0=None, previous_labels=None,
+                      drop_ones=False):
+    # returns (labels, n_clusters, eigenvalues, eigenvectors); with n_clusters=None the count comes from the eigengap
+    # (drop_ones as in eigengap_clusters)
+    # the eigenvectors are the unnormalized embedding, e.g. to seed a layout (graph_layout.initial_positions)
+    # previous_labels (one per node, -1 where unknown) warm-starts KMeans from the mean embedding of each previous
+    # cluster when the number of clusters is unchanged; label i then grows from the i-th smallest previous label
+    eigenvalues, vectors = spectral_embedding(adjacency, (n_clusters or max_clusters) + 1, random_state, v0)
+    if n_clusters is None:
+        n_clusters = eigengap_clusters(eigenvalues, drop_ones=drop_ones)
+    embedding = vectors[:, :n_clusters]
+    # rows onto the unit sphere (Ng, Jordan and Weiss), so high and low degree nodes cluster alike
+    norms = np.linalg.norm(embedding, axis=1, keepdims=True)
+    embedding = embedding / np.where(norms > 0, norms, 1)
+    kmeans = KMeans(n_clusters=n_clusters, n_init=10, random_state=random_state)
+    if previous_labels is not None:
+        previous = np.unique(previous_labels[previous_labels >= 0])
+        if len(previous) == n_clusters:
+            centers = np.array([embedding[previous_labels == label].mean(axis=0) for label in previous])
+            kmeans = KMeans(n_clusters=n_clusters, init=centers, n_init=1, random_state=random_state)
+    labels = kmeans.fit_predict(embedding)
+    return labels, n_clusters, eigenvalues, vectors
@@ -0,0 +1,166 @@
+# director-actor communities over time: the collaboration graph of sliding windows of years (e.g. 10-year
+# windows every 5 years), clustered window by window, with how much the communities changed between windows
+# the credits are sorted by year once; sliding the window only adds the credits entering it and removes those
+# leaving it from a per-edge count (an edge is in the snapshot while its count is positive), instead of
+# rebuilding the graph from the csv for every window. Each window's clustering starts from the previous one:
+# the eigensolver from the previous embedding, KMeans from the previous clusters' centers. A window with fewer
+# than MIN_NODES nodes is not clustered; it gets a Skipped row and the window after it starts from scratch
+#   python temporal_graph.py [width] [step]
+import os
+import sys
+import time
+import itertools
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.optimize import linear_sum_assignment
+from sklearn.metrics import adjusted_rand_score
+from collab_edges import director_actor_edges
+from spectral import spectral_clusters
+
+MIN_FILMS = 20          # films (over all years) for a director to be in the graph
+WINDOW_WIDTH = 10       # years per window
+WINDOW_STEP = 5         # years between window starts
+MIN_NODES = 10          # smaller windows are not clustered
+
+
+class TemporalGraph:
+    def __init__(self, data, min_films=MIN_FILMS):
+        # one node per name (directors and actors, as in spectral.bipartite_adjacency), one edge per connected pair
+        credits, _ = director_actor_edges(data, min_films, columns=['Year'])
+        credits = credits.assign(Year=pd.to_numeric(credits['Year'], errors='coerce')).dropna(subset=['Year'])
+        codes, self.names = pd.factorize(pd.concat([credits['Director'], credits['Cast']]))
+        first, second = codes[:len(credits)], codes[len(credits):]
+        low, high = np.minimum(first, second), np.maximum(first, second)
+        edge_ids, edge_keys = pd.factorize(low.astype(np.int64) * len(self.names) + high)
+        self.names = np.asarray(self.names)
+        self.edge_low, self.edge_high = edge_keys // len(self.names), edge_keys % len(self.names)
+
+        # credits sorted by year, so the credits of any range of years are one slice
+        order = np.argsort(credits['Year'].to_numpy(), kind='stable')
+        self.credit_year = credits['Year'].to_numpy()[order]
+        self.credit_edge = edge_ids[order]
+        self.edge_count = np.zeros(len(edge_keys), dtype=np.int32)
+        self.window = (0, 0)
+
+    def years(self):
+        # first and last year with a credit
+        if not len(self.credit_year):
+            return 0, -1
+        return int(self.credit_year[0]), int(self.credit_year[-1])
+
+    def credits_between(self, start, end):
+        # credits with start <= year < end
+        return self.credit_edge[np.searchsorted(self.credit_year, start):np.searchsorted(self.credit_year, end)]
+
+    def update(self, start, end, sign):
+        if start < end:
+            np.add.at(self.edge_count, self.credits_between(start, end), sign)
+
+    def slide_to(self, start, end):
+        # moves the window to [start, end): only the years entering and leaving it are touched
+        old_start, old_end = self.window
+        if end <= old_start or start >= old_end:
+            self.update(old_start, old_end, -1)
+            self.update(start, end, 1)
+        else:
+            self.update(old_start, start, -1)
+            self.update(end, old_end, -1)
+            self.update(start, old_start, 1)
+            self.update(old_end, end, 1)
+        self.window = (start, end)
+
+    def snapshot(self):
+        # (adjacency, node ids) of the current window, over the nodes with at least one edge in it
+        active = self.edge_count > 0
+        low, high = self.edge_low[active], self.edge_high[active]
+        nodes, local = np.unique(np.concatenate([low, high]), return_inverse=True)
+        rows, cols = local[:len(low)], local[len(low):]
+        adjacency = sp.csr_matrix((np.ones(2 * len(rows), dtype=np.float32),
+                                   (np.concatenate([rows, cols]), np.concatenate([cols, rows]))),
+                                  shape=(len(nodes), len(nodes)))
+        return adjacency, nodes
+
+
+def match_labels(labels, previous):
+    # renumbers labels so they agree as much as possible with previous (-1 = node not in the previous window)
+    known = previous >= 0
+    if not known.any():
+        return labels
+    overlap = pd.crosstab(labels[known], previous[known])
+    rows, cols = linear_sum_assignment(-overlap.to_numpy())
+    mapping = dict(zip(overlap.index[rows], overlap.columns[cols]))
+    spare = (label for label in itertools.count() if label not in set(mapping.values()))
+    for label in np.unique(labels):
+        if label not in mapping:
+            mapping[label] = next(spare)
+    return np.vectorize(mapping.get)(labels)
+
+
+def track_communities(data, width=WINDOW_WIDTH, step=WINDOW_STEP, n_clusters=None, min_films=MIN_FILMS):
+    # returns (memberships: Start, End, Name, Cluster per node and window; churn: one row per window)
+    graph = TemporalGraph(data, min_films)
+    first_year, last_year = graph.years()
+    node_labels = np.full(len(graph.names), -1)
+    node_vectors = None
+    memberships, churn = [], []
+    for start in range(first_year, last_year + 1, step):
+        began = time.time()
+        graph.slide_to(start, start + width)
+        adjacency, nodes = graph.snapshot()
+        if len(nodes) < MIN_NODES:
+            churn.append({'Start': start, 'End': start + width - 1, 'Nodes': len(nodes), 'Edges': adjacency.nnz // 2,
+                          'Clusters': 0, 'Skipped': True, 'Seconds': round(time.time() - began, 3)})
+            node_labels = np.full(len(graph.names), -1)
+            node_vectors = None
+            if start + width > last_year:
+                break
+            continue
+        previous = node_labels[nodes]
+
+        # warm start: the previous leading eigenvectors summed, on the nodes the two windows share
+        v0 = None
+        if node_vectors is not None:
+            v0 = node_vectors[nodes]
+            if not v0.any():
+                v0 = None
+        labels, k, _, vectors = spectral_clusters(adjacency, n_clusters, v0=v0, previous_labels=previous,
+                                                  drop_ones=True)
+        labels = match_labels(labels, previous)
+
+        known = previous >= 0
+        stayed = known.sum()
+        moved = (labels[known] != previous[known]).sum()
+        churn.append({
+            'Start': start, 'End': start + width - 1, 'Nodes': len(nodes), 'Edges': adjacency.nnz // 2,
+            'Clusters': k, 'Skipped': False, 'Joined': len(nodes) - stayed,
+            'Left': int((node_labels >= 0).sum() - stayed),
+            'Churn': moved / stayed if stayed else np.nan,
+            'ARI': adjusted_rand_score(previous[known], labels[known]) if stayed else np.nan,
+            'Seconds': round(time.time() - began, 3),
+        })
+        memberships.append(pd.DataFrame({'Start': start, 'End': start + width - 1, 'Name': graph.names[nodes],
+                                         'Cluster': labels}))
+
+        node_labels = np.full(len(graph.names), -1)
+        node_labels[nodes] = labels
+        node_vectors = np.zeros(len(graph.names))
+        node_vectors[nodes] = vectors[:, :k].sum(axis=1)
+        if start + width > last_year:
+            break
+    memberships = pd.concat(memberships, ignore_index=True) if memberships else pd.DataFrame(
+        columns=['Start', 'End', 'Name', 'Cluster'])
+    return memberships, pd.DataFrame(churn)
+
+
+def main(width=WINDOW_WIDTH, step=WINDOW_STEP):
+    os.makedirs('./output', exist_ok=True)
+    data = pd.read_csv('./data/imdb-movies-dataset.csv')
+    memberships, churn = track_communities(data, width, step)
+    memberships.to_csv(f'./output/temporal_clusters_{width}y.csv', index=False)
+    churn.to_csv(f'./output/temporal_churn_{width}y.csv', index=False)
+    print(churn.to_string(index=False))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,97 @@
+# joins movie titles from two tables (e.g. the collaboration lists against the box-office table)
+# titles are normalized (casefolded, accents, punctuation and spaces stripped) and joined exactly on that key
+# in one merge, so "Up" only matches "Up" and no longer every title containing "up"
+# when both sides have a year, pairs more than `year_slack` years apart are dropped (year blocking), and titles
+# left over get a bounded fuzzy pass inside their year block: only against keys that start with the same letters,
+# only for a character or two of difference, and never between titles with different numbers (sequels stay apart)
+import re
+import difflib
+import numpy as np
+import pandas as pd
+
+ROMAN_NUMERAL = re.compile(r'^[ivx]+$')
+BLOCK_LENGTH = 4
+
+
+def normalize_words(titles):
+    titles = titles.fillna('').astype(str).str.normalize('NFKD').str.encode('ascii', 'ignore').str.decode('ascii')
+    titles = titles.str.casefold().str.replace('&', ' and ', regex=False).str.replace(r"['`$]", '', regex=True)
+    return titles.str.replace(r'[^\w\s]|_', ' ', regex=True).str.split().str.join(' ')
+
+
+def normalize_titles(titles):
+    # the join key: "Harry Potter and the Deathly Hallows - Part 1" and "...Hallows: Part 1" come out the same
+    return normalize_words(titles).str.replace(' ', '', regex=False)
+
+
+def number_tokens(words):
+    # digits anywhere ("Men in Black 3" after the superscript is unfolded) and roman numerals as whole words
+    return tuple(re.findall(r'\d+', words)) + tuple(word for word in words.split() if ROMAN_NUMERAL.match(word))
+
+
+def edit_size(a, b):
+    return sum(max(i2 - i1, j2 - j1) for tag, i1, i2, j1, j2 in difflib.SequenceMatcher(None, a, b).get_opcodes()
+               if tag != 'equal')
+
+
+def fuzzy_pairs(left, right, min_length, max_edits):
+    # left and right are (key, words) frames of the unmatched left keys and all right keys
+    blocks = {}
+    for key, words in zip(right['_key'], right['_words']):
+        blocks.setdefault(key[:BLOCK_LENGTH], []).append((key, number_tokens(words)))
+    pairs = []
+    for key, words in zip(left['_key'], left['_words']):
+        if len(key) < min_length:
+            continue
+        numbers = number_tokens(words)
+        allowed = max(1, len(key) * max_edits // 20)
+        candidates = [(edit_size(key, other), other) for other, other_numbers in blocks.get(key[:BLOCK_LENGTH], [])
+                      if other_numbers == numbers and abs(len(other) - len(key)) <= allowed]
+        candidates = [candidate for candidate in candidates if candidate[0] <= allowed]
+        if candidates:
+            pairs.append((key, min(candidates)[1]))
+    return pd.DataFrame(pairs, columns=['_key', '_right_key'])
+
+
+def match_titles(left, right, left_on='Title', right_on='Title', left_year=None, right_year=None, year_slack=1,
+                 fuzzy=True, min_fuzzy_length=8, max_edits=1):
+    # returns one row per (left row, right row) pair: the left columns, the right columns (suffixed '_right' on a
+    # name clash) and a 'Match' column saying whether the pair was found 'exact' or 'fuzzy'
+    # max_edits is the number of differing characters allowed per 20 characters of title in the fuzzy pass
+    left = left.reset_index(drop=True)
+    right = right.reset_index(drop=True)
+    left_words = normalize_words(left[left_on])
+    right_words = normalize_words(right[right_on])
+    left_keys = pd.DataFrame({'_key': left_words.str.replace(' ', '', regex=False), '_words': left_words,
+                              '_left_row': np.arange(len(left))})
+    right_keys = pd.DataFrame({'_key': right_words.str.replace(' ', '', regex=False), '_words': right_words,
+                               '_right_row': np.arange(len(right))})
+    left_keys = left_keys[left_keys['_key'] != '']
+    right_keys = right_keys[right_keys['_key'] != '']
+
+    pairs = left_keys[['_key', '_left_row']].merge(right_keys[['_key', '_right_row']], on='_key')
+    pairs['Match'] = 'exact'
+
+    # a near-miss title is only trusted when the years agree too, so without years there is no fuzzy pass
+    with_years = left_year is not None and right_year is not None
+    if fuzzy and with_years:
+        unmatched = left_keys[~left_keys['_key'].isin(pairs['_key'])].drop_duplicates('_key')
+        close = fuzzy_pairs(unmatched, right_keys.drop_duplicates('_key'), min_fuzzy_length, max_edits)
+        if len(close):
+            fuzzy_matches = (left_keys[['_key', '_left_row']].merge(close, on='_key')
+                             .merge(right_keys[['_key', '_right_row']].rename(columns={'_key': '_right_key'}),
+                                    on='_right_key'))
+            fuzzy_matches['Match'] = 'fuzzy'
+            pairs = pd.concat([pairs, fuzzy_matches.drop(columns='_right_key')], ignore_index=True)
+
+    if with_years:
+        years_apart = np.abs(left[left_year].to_numpy(dtype=float)[pairs['_left_row']]
+                             - right[right_year].to_numpy(dtype=float)[pairs['_right_row']])
+        # a missing year on either side does not rule out an exact pair, but a fuzzy pair needs both years
+        exact = (pairs['Match'] == 'exact').to_numpy()
+        pairs = pairs[(years_apart <= year_slack) | (exact & np.isnan(years_apart))]
+
+    matched = left.iloc[pairs['_left_row']].reset_index(drop=True)
+    right_columns = right.iloc[pairs['_right_row']].reset_index(drop=True)
+    right_columns.columns = [f'{column}_right' if column in matched.columns else column for column in right.columns]
+    return pd.concat([matched, right_columns, pairs[['Match']].reset_index(drop=True)], axis=1)
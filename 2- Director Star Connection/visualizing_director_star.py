@@ -2,40 +2,60 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import time
 
+TOP_DIRECTORS = 100     # directors shown, by number of movies
+TOP_STARS = 5           # stars kept per director, the rest are summed into one "Other stars" segment
+
 # Load the CSV file
 file_path = './data/movies.csv'  # Update with your actual file path
 print("Loading CSV file...")
 start_time = time.time()
-movies_df = pd.read_csv(file_path)
+movies_df = pd.read_csv(file_path, usecols=['director', 'star'])
 print(f"CSV file loaded successfully in {time.time() - start_time:.2f} seconds.")
 
 # Display the first few rows of the dataframe
 print("First few rows of the dataframe:")
 print(movies_df.head())
 
-# Group by director and star, and count the occurrences
-print("Grouping by director and star...")
+# Select the top directors first, from the movies that have both a director and a star, so the director x star
+# counts are only built for them and only for the pairs that exist (no dense director x star table); ties go
+# to the director first in alphabetical order, as with the full table
+print(f"Selecting the top {TOP_DIRECTORS} directors...")
 start_time = time.time()
-director_star_count = movies_df.groupby(['director', 'star']).size().unstack(fill_value=0)
-print(f"Grouping completed in {time.time() - start_time:.2f} seconds. Here is a preview of the grouped data:")
-print(director_star_count.head())
+movies_df = movies_df.dropna(subset=['director', 'star'])
+top_directors = movies_df['director'].value_counts().sort_index().nlargest(TOP_DIRECTORS).index
+print(f"Top {TOP_DIRECTORS} directors selected in {time.time() - start_time:.2f} seconds.")
 
-# Sum the number of movies for each director and select the top 100
-top_directors = director_star_count.sum(axis=1).nlargest(100).index
-print(f"Top 100 directors selected based on the number of movies.")
+print("Counting movies per director and star...")
+start_time = time.time()
+director_star_count = (movies_df[movies_df['director'].isin(top_directors)]
+                       .groupby(['director', 'star']).size().rename('movies').reset_index())
+print(f"Counted {len(director_star_count)} director-star pairs in {time.time() - start_time:.2f} seconds. Preview:")
+print(director_star_count.head())
 
-# Filter the data to include only the top 100 directors
-director_star_count_top = director_star_count.loc[top_directors]
+# Rank the stars within each director; stars past TOP_STARS all go to the last segment
+print(f"Keeping the top {TOP_STARS} stars per director...")
+start_time = time.time()
+director_star_count = director_star_count.sort_values(['director', 'movies', 'star'], ascending=[True, False, True])
+director_star_count['segment'] = director_star_count.groupby('director').cumcount().clip(upper=TOP_STARS)
+segments = (director_star_count.pivot_table(index='director', columns='segment', values='movies', aggfunc='sum',
+                                            fill_value=0)
+            .reindex(index=top_directors, columns=range(TOP_STARS + 1), fill_value=0))
+print(f"Segments built in {time.time() - start_time:.2f} seconds.")
 
-# Plotting the data
+# Plotting the data: one bar call per segment, whatever the number of stars
 print("Plotting the data...")
 start_time = time.time()
 fig, ax = plt.subplots(figsize=(20, 12))  # Increase the figure size
-director_star_count_top.plot(kind='bar', stacked=True, ax=ax)
-ax.set_title('Number of Movies Directed by Top 100 Directors with Specific Stars')
+bottom = pd.Series(0, index=segments.index)
+colors = plt.cm.tab10(range(TOP_STARS + 1))
+for segment, color in zip(segments.columns, colors):
+    label = f'Star #{segment + 1}' if segment < TOP_STARS else 'Other stars'
+    ax.bar(segments.index, segments[segment], bottom=bottom, color=color, label=label)
+    bottom += segments[segment]
+ax.set_title(f'Number of Movies Directed by Top {TOP_DIRECTORS} Directors with Specific Stars')
 ax.set_xlabel('Directors')
 ax.set_ylabel('Number of Movies')
-ax.legend(title='Stars', bbox_to_anchor=(1.05, 1), loc='upper left')
+ax.legend(title='Stars (by movies with the director)', bbox_to_anchor=(1.05, 1), loc='upper left')
 plt.xticks(rotation=45, ha='right')
 plt.subplots_adjust(bottom=0.3)  # Adjust the bottom margin
 print(f"Plotting completed in {time.time() - start_time:.2f} seconds.")
@@ -1,36 +1,47 @@
 import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+import os
 import re
+import sys
 import pycountry
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.http_cache import cached_get
+from scraping.parsers import make_soup
+
+countries = [country.name for country in pycountry.countries]
+common_places = countries + [
+    "Gotham City", "Whoville", "Middle-Earth", "Bedrock", "Monstropolis", "Agrabah",
+    "Atlantis", "Narnia", "Neverland", "Wakanda", "Duloc", "Isla Sorna", "Monstropolis"
+]
+# compiled once instead of for every paragraph we look at
+place_patterns = [(place, re.compile(r'\b' + re.escape(place) + r'\b', re.IGNORECASE)) for place in common_places]
+
 def extract_place(text):
     if pd.isna(text):
         return text
 
-    countries = [country.name for country in pycountry.countries]
-    common_places = countries + [
-        "Gotham City", "Whoville", "Middle-Earth", "Bedrock", "Monstropolis", "Agrabah",
-        "Atlantis", "Narnia", "Neverland", "Wakanda", "Duloc", "Isla Sorna", "Monstropolis"
-    ]
-
-    for place in common_places:
-        if re.search(r'\b' + re.escape(place) + r'\b', text, re.IGNORECASE):
+    for place, pattern in place_patterns:
+        if pattern.search(text):
             return place
     return "Unknown"
 
 def search_wiki(url, term):
     search_url = f"{url}{term.replace(' ', '_')}"
-    response = requests.get(search_url)
+    # misses (404) are cached too, so a re-run does not ask the wikis for the same missing pages again
+    response = cached_get(search_url)
     if response.status_code == 200:
-        soup = BeautifulSoup(response.content, 'html.parser')
-        paragraphs = soup.find_all('p')
-        for para in paragraphs:
-            if 'country' in para.text.lower() or 'origin' in para.text.lower():
-                text = re.sub(r'\[.*?\]', '', para.text)
-                place = extract_place(text)
-                if place != "Unknown":
-                    return place
+        return parse_origin(response.content)
+    return None
+
+def parse_origin(html):
+    soup = make_soup(html)
+    paragraphs = soup.find_all('p')
+    for para in paragraphs:
+        if 'country' in para.text.lower() or 'origin' in para.text.lower():
+            text = re.sub(r'\[.*?\]', '', para.text)
+            place = extract_place(text)
+            if place != "Unknown":
+                return place
     return None
 
 def search_villains(movie, villain):
@@ -74,6 +85,7 @@ def update_csv(csv_path):
     print(f"Updated CSV saved to {csv_path}")
     return df
 
-csv_path = 'output/top_10_box_office_movies_1977_2023_with_villains_origins.csv'
-updated_df = update_csv(csv_path)
-print(updated_df.head())
\ No newline at end of file
+if __name__ == '__main__':
+    csv_path = 'output/top_10_box_office_movies_1977_2023_with_villains_origins.csv'
+    updated_df = update_csv(csv_path)
+    print(updated_df.head())
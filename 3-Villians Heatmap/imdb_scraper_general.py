@@ -1,53 +1,75 @@
-from bs4 import BeautifulSoup
-import requests
 import re
 import json
 from selenium import webdriver
 import time
 import os
+import sys
 
-driver = webdriver.Chrome()
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.http_cache import cached_render
+from scraping.parsers import make_soup
 
-url = 'http://www.imdb.com/chart/top'
-driver.get(url)
+driver = None
 
-time.sleep(5)  
 
-soup = BeautifulSoup(driver.page_source, "html.parser")
-movies = soup.select('td.titleColumn')
-crew = [a.attrs.get('title') for a in soup.select('td.titleColumn a')]
-ratings = [b.attrs.get('data-value') for b in soup.select('td.posterColumn span[name=ir]')]
+def render_page(url):
+    # the browser is only started when the page is not in the shared response cache
+    global driver
+    if driver is None:
+        driver = webdriver.Chrome()
+    driver.get(url)
+    time.sleep(5)
+    return driver.page_source
 
-movie_list = []
 
-for index in range(len(movies)):
-    movie_string = movies[index].get_text()
-    movie = (' '.join(movie_string.split()).replace('.', ''))
-    media_title = movie[len(str(index)) + 1:-7]
-    year = re.search(r'\((.*?)\)', movie_string).group(1)
-    place = movie[:len(str(index)) - (len(movie))]
+def parse_top_chart(html):
+    soup = make_soup(html)
+    movies = soup.select('td.titleColumn')
+    crew = [a.attrs.get('title') for a in soup.select('td.titleColumn a')]
+    ratings = [b.attrs.get('data-value') for b in soup.select('td.posterColumn span[name=ir]')]
 
-    director, actors = crew[index].split('(dir.), ')
+    movie_list = []
 
-    data = {
-        "place": place.strip(),
-        "media_title": media_title.strip(),
-        "rating": ratings[index],
-        "year": year,
-        "director": director.strip(),
-        "actors": actors.strip()
-    }
-    movie_list.append(data)
+    for index in range(len(movies)):
+        movie_string = movies[index].get_text()
+        movie = (' '.join(movie_string.split()).replace('.', ''))
+        media_title = movie[len(str(index)) + 1:-7]
+        year = re.search(r'\((.*?)\)', movie_string).group(1)
+        place = movie[:len(str(index)) - (len(movie))]
 
-for movie in movie_list:
-    print(movie['place'], '-', movie['media_title'], '(' + movie['year'] + ') -',
-          'Director:', movie['director'], 'Actors:', movie['actors'], 'Rating:', movie['rating'])
+        director, actors = crew[index].split('(dir.), ')
 
-output_dir = '3-Villians Heatmap/output'
-os.makedirs(output_dir, exist_ok=True)
+        data = {
+            "place": place.strip(),
+            "media_title": media_title.strip(),
+            "rating": ratings[index],
+            "year": year,
+            "director": director.strip(),
+            "actors": actors.strip()
+        }
+        movie_list.append(data)
+    return movie_list
 
-output_file_path = os.path.join(output_dir, 'imdb_movies_and_directors.json')
-with open(output_file_path, 'w', encoding='utf-8') as f:
-    json.dump(movie_list, f, ensure_ascii=False, indent=4)
 
-driver.quit()
+def main():
+    url = 'http://www.imdb.com/chart/top'
+    page_source = cached_render(url, render_page)
+    movie_list = parse_top_chart(page_source or '')
+
+    for movie in movie_list:
+        print(movie['place'], '-', movie['media_title'], '(' + movie['year'] + ') -',
+              'Director:', movie['director'], 'Actors:', movie['actors'], 'Rating:', movie['rating'])
+
+    output_dir = '3-Villians Heatmap/output'
+    os.makedirs(output_dir, exist_ok=True)
+
+    output_file_path = os.path.join(output_dir, 'imdb_movies_and_directors.json')
+    with open(output_file_path, 'w', encoding='utf-8') as f:
+        json.dump(movie_list, f, ensure_ascii=False, indent=4)
+
+    if driver is not None:
+        driver.quit()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,31 +1,88 @@
 import json
 import os
+import sys
 import time
 from selenium import webdriver
-from bs4 import BeautifulSoup
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.async_fetch import fetch_many, DEFAULT_HEADERS
+from scraping.http_cache import cached_render, get_cache
+from scraping.parsers import make_soup
 
 BASE_URL = "https://www.superherodb.com"
 MALE_VILLAINS_URL = f'{BASE_URL}/characters/male/villains/?set_gender=male&set_side=bad&page_nr='
 FEMALE_VILLAINS_URL = f'{BASE_URL}/characters/female/villains/?set_gender=female&set_side=bad&page_nr='
 
+## PLAIN HTTP MODE ##
+# pages are fetched in parallel without a browser; Chrome only opens for pages whose plain HTML has nothing to parse
+USE_BROWSER = False     # the old one-page-at-a-time Selenium run
+RATE_LIMIT = 5.0        # requests per second over all workers
+BURST = 10
+MAX_CONCURRENCY = 16
+SAVE_EVERY = 200        # villains per batch; the json is rewritten after every batch so a run can be resumed
+
+class LazyDriver:
+    # starts Chrome on first use, so a run served entirely from the response cache never opens a browser
+    def __init__(self, options):
+        self.options = options
+        self.driver = None
+
+    def __getattr__(self, name):
+        if self.driver is None:
+            self.driver = webdriver.Chrome(options=self.options)
+        return getattr(self.driver, name)
+
+    def quit(self):
+        if self.driver is not None:
+            self.driver.quit()
+
+def get_page_source(driver, url):
+    def render(url):
+        driver.get(url)
+        time.sleep(1)
+        driver.execute_script("window.stop();")
+        return driver.page_source
+    return cached_render(url, render)
+
+def get_browser_page_source(driver, url):
+    # fallback for a page the plain fetch could not use: drop the cached copy and render it in Chrome
+    get_cache().forget(url)
+    return get_page_source(driver, url)
+
+def fetch_pages(urls):
+    return fetch_many(urls, rate=RATE_LIMIT, burst=BURST, concurrency=MAX_CONCURRENCY, headers=DEFAULT_HEADERS)
+
 def get_villain_links(driver, base_url, max_page):
     links = []
     for page in range(1, max_page + 1):
         url = f"{base_url}{page}"
-        driver.get(url)
-        time.sleep(1)
-        driver.execute_script("window.stop();")
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
-        character_links = [BASE_URL + a['href'] for a in soup.select('div.column.col-12 ul.list-md li a')]
-        links.extend(character_links)
+        links.extend(parse_villain_links(get_page_source(driver, url) or ''))
+    return links
+
+def get_villain_links_http(driver, base_url, max_page):
+    urls = [f"{base_url}{page}" for page in range(1, max_page + 1)]
+    pages = fetch_pages(urls)
+    links = []
+    for url in urls:
+        status, html = pages[url]
+        page_links = parse_villain_links(html or '')
+        if not page_links:
+            print(f"No villains in the plain page {url} (status {status}), trying the browser...")
+            page_links = parse_villain_links(get_browser_page_source(driver, url) or '')
+        links.extend(page_links)
     return links
 
+def parse_villain_links(html):
+    # (url, name) for every villain on a listing page; the name lets a resumed run skip villains it already has
+    soup = make_soup(html)
+    return [(BASE_URL + a['href'], a.text.strip()) for a in soup.select('div.column.col-12 ul.list-md li a')]
+
 def get_villain_details(driver, url):
-    driver.get(url)
-    time.sleep(1)
-    driver.execute_script("window.stop();")
+    return parse_villain_details(get_page_source(driver, url) or '', url)
+
+def parse_villain_details(html, url):
     try:
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        soup = make_soup(html)
         details = {}
         name_tag = soup.select_one('div.columns.profile-titles h1')
         if name_tag:
@@ -53,21 +110,55 @@ def get_villain_details(driver, url):
         print(f"Error fetching details for {url}: {e}")
         return {}
 
-def scrape_villains(driver, links):
-    villains = []
-    for link in links:
+def make_villain(details, url):
+    return {
+        'name': details['name'],
+        'place_of_birth': details.get('Place of birth', 'Unknown'),
+        'universe': details.get('universe', 'Unknown'),
+        'species': details.get('species', 'Unknown'),
+        'url': url
+    }
+
+def scrape_villains(driver, links, villains, output_path):
+    for idx, (link, _) in enumerate(links):
         details = get_villain_details(driver, link)
         if 'name' in details:
-            villain = {
-                'name': details['name'],
-                'place_of_birth': details.get('Place of birth', 'Unknown'),
-                'universe': details.get('universe', 'Unknown'),
-                'species': details.get('species', 'Unknown')
-            }
+            villain = make_villain(details, link)
             print(f"Scraped villain: {villain}")
             villains.append(villain)
+        if (idx + 1) % SAVE_EVERY == 0:
+            save_villains(villains, output_path)
+    return villains
+
+def scrape_villains_http(driver, links, villains, output_path):
+    for start in range(0, len(links), SAVE_EVERY):
+        batch = [link for link, _ in links[start:start + SAVE_EVERY]]
+        print(f"Fetching villains {start + 1}-{start + len(batch)} of {len(links)}...")
+        pages = fetch_pages(batch)
+        for link in batch:
+            status, html = pages[link]
+            details = parse_villain_details(html, link) if html else {}
+            if 'name' not in details:
+                print(f"Falling back to the browser for {link} (status {status})")
+                details = parse_villain_details(get_browser_page_source(driver, link) or '', link)
+            if 'name' in details:
+                villains.append(make_villain(details, link))
+        save_villains(villains, output_path)
+        print(f"Saved {len(villains)} villains")
     return villains
 
+def load_villains(output_path):
+    if not os.path.exists(output_path):
+        return []
+    with open(output_path, 'r') as f:
+        return json.load(f)
+
+def save_villains(villains, output_path):
+    # write to a temporary file first so an interrupted run never leaves a half-written json behind
+    with open(output_path + '.tmp', 'w') as f:
+        json.dump(villains, f, indent=4)
+    os.replace(output_path + '.tmp', output_path)
+
 def main():
     chrome_options = webdriver.ChromeOptions()
     prefs = {
@@ -79,19 +170,28 @@ def main():
         "profile.managed_default_content_settings.ads": 2
     }
     chrome_options.add_experimental_option("prefs", prefs)
-    driver = webdriver.Chrome(options=chrome_options)
-
-    male_links = get_villain_links(driver, MALE_VILLAINS_URL, max_page=18)
-    female_links = get_villain_links(driver, FEMALE_VILLAINS_URL, max_page=5)
-    all_links = male_links + female_links
-
-    villains_data = scrape_villains(driver, all_links)
+    driver = LazyDriver(chrome_options)
 
     output_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'output')
     os.makedirs(output_dir, exist_ok=True)
     output_path = os.path.join(output_dir, 'villains_data.json')
-    with open(output_path, 'w') as f:
-        json.dump(villains_data, f, indent=4)
+
+    get_links = get_villain_links if USE_BROWSER else get_villain_links_http
+    male_links = get_links(driver, MALE_VILLAINS_URL, max_page=18)
+    female_links = get_links(driver, FEMALE_VILLAINS_URL, max_page=5)
+    all_links = list(dict.fromkeys(male_links + female_links))
+
+    # resume: villains already in the json are skipped by url; names repeat across different villains (Darkseid,
+    # Lex Luthor...), so a name only counts for saved records from older files that have no url
+    villains_data = load_villains(output_path)
+    done_urls = {villain['url'] for villain in villains_data if 'url' in villain}
+    done_names = {villain['name'] for villain in villains_data if 'url' not in villain}
+    todo = [(link, name) for link, name in all_links if link not in done_urls and name not in done_names]
+    print(f"{len(all_links)} villains listed, {len(all_links) - len(todo)} already saved, {len(todo)} to scrape")
+
+    scrape = scrape_villains if USE_BROWSER else scrape_villains_http
+    villains_data = scrape(driver, todo, villains_data, output_path)
+    save_villains(villains_data, output_path)
 
     print(f"Data saved to '{output_path}'")
     driver.quit()
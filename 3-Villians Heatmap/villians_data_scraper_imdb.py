@@ -1,38 +1,102 @@
-import requests
-from bs4 import BeautifulSoup
 import pandas as pd
 import os
+import sys
+from io import StringIO
 
-def get_top_10_movies(year):
-    url = f"https://www.boxofficemojo.com/year/{year}/?grossesOption=totalGrosses"
-    response = requests.get(url)
-    soup = BeautifulSoup(response.content, 'html.parser')
-    table = soup.find('table')
-    rows = table.find_all('tr')[1:11]
-    movies = []
-    for row in rows:
-        cols = row.find_all('td')
-        rank = cols[0].text.strip()
-        title = cols[1].text.strip()
-        gross = cols[5].text.strip()
-        movies.append([year, rank, title, gross])
-    return movies
-
-all_movies = []
-for year in range(1977, 2024):
-    try:
-        top_movies = get_top_10_movies(year)
-        all_movies.extend(top_movies)
-        print(f"Successfully scraped data for {year}")
-    except Exception as e:
-        print(f"Failed to scrape data for {year}: {e}")
-
-df = pd.DataFrame(all_movies, columns=['Year', 'Rank', 'Title', 'Gross'])
-
-output_folder = 'output'
-os.makedirs(output_folder, exist_ok=True)
-
-output_path = os.path.join(output_folder, 'top_10_box_office_movies_1977_2023.csv')
-df.to_csv(output_path, index=False)
-
-print("Data scraping completed and saved to CSV.")
\ No newline at end of file
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.async_fetch import fetch_many
+from scraping.http_cache import get_cache
+
+FIRST_YEAR = 1977
+LAST_YEAR = 2023
+TOP_N = 10              # movies kept per year
+MAX_CONCURRENCY = 6
+RATE_LIMIT = 2.0        # requests per second over all years
+YEAR_RETRIES = 3        # rounds over the years that failed to fetch or parse
+# one csv per year, so a single missing year can be fetched again on its own:
+#   python villians_data_scraper_imdb.py 1999 2004
+PARTITION_FOLDER = os.path.join('output', 'box_office_top_{top_n}')
+
+def year_url(year):
+    return f"https://www.boxofficemojo.com/year/{year}/?grossesOption=totalGrosses"
+
+def partition_path(year, top_n=TOP_N):
+    return os.path.join(PARTITION_FOLDER.format(top_n=top_n), f'year={year}.csv')
+
+def parse_gross(gross):
+    # "$307,263,857" -> 307263857, parsed once for the whole column
+    values = pd.to_numeric(gross.astype(str).str.replace(r'[$,]', '', regex=True), errors='coerce')
+    if values.isna().any():
+        raise ValueError(f"unreadable gross values: {list(gross[values.isna()])}")
+    return values.astype('int64')
+
+def parse_top_movies(html, year, top_n=TOP_N):
+    # the whole table in one read_html call; rank, release and gross are its 1st, 2nd and 6th columns
+    table = pd.read_html(StringIO(html.decode('utf-8') if isinstance(html, bytes) else html))[0]
+    table = table.iloc[:top_n, [0, 1, 5]]
+    return pd.DataFrame({
+        'Year': pd.Series(year, index=table.index, dtype='int64'),
+        'Rank': table.iloc[:, 0].astype('int64'),
+        'Title': table.iloc[:, 1].astype(str).str.strip(),
+        'Gross': parse_gross(table.iloc[:, 2]),
+    }).reset_index(drop=True)
+
+def scrape_years(years, top_n=TOP_N):
+    # fetches every year concurrently; years whose page fails to fetch or parse are tried again in the next round
+    # returns {year: DataFrame} and {year: reason} for the years that still failed after the last round
+    movies = {}
+    failures = {}
+    pending = list(years)
+    for attempt in range(1, YEAR_RETRIES + 1):
+        if attempt > 1:
+            print(f"Retrying {len(pending)} years (round {attempt} of {YEAR_RETRIES})...")
+            for year in pending:
+                get_cache().forget(year_url(year))
+        pages = fetch_many([year_url(year) for year in pending], rate=RATE_LIMIT, burst=MAX_CONCURRENCY,
+                           concurrency=MAX_CONCURRENCY)
+        failed = []
+        for year in pending:
+            status, html = pages[year_url(year)]
+            try:
+                if html is None or status != 200:
+                    raise ValueError(f"status {status}")
+                movies[year] = parse_top_movies(html, year, top_n)
+                failures.pop(year, None)
+                print(f"Successfully scraped data for {year}")
+            except Exception as e:
+                failures[year] = f"{type(e).__name__}: {e}"
+                failed.append(year)
+        pending = failed
+        if not pending:
+            break
+    return movies, failures
+
+def main(years=None, top_n=TOP_N):
+    os.makedirs(PARTITION_FOLDER.format(top_n=top_n), exist_ok=True)
+    all_years = range(FIRST_YEAR, LAST_YEAR + 1)
+    # explicit years are fetched again from the site; otherwise only the years that have no partition yet
+    if years:
+        for year in years:
+            get_cache().forget(year_url(year))
+    else:
+        years = [year for year in all_years if not os.path.exists(partition_path(year, top_n))]
+    movies, failures = scrape_years(years, top_n)
+    for year, df in movies.items():
+        df.to_csv(partition_path(year, top_n), index=False)
+
+    for year, reason in sorted(failures.items()):
+        print(f"Failed to scrape data for {year}: {reason}")
+    if failures:
+        print(f"Re-run with the missing years to fetch them alone: {' '.join(map(str, sorted(failures)))}")
+
+    paths = [partition_path(year, top_n) for year in all_years]
+    partitions = [pd.read_csv(path) for path in paths if os.path.exists(path)]
+    df = pd.concat(partitions, ignore_index=True) if partitions else pd.DataFrame(columns=['Year', 'Rank', 'Title', 'Gross'])
+
+    output_path = os.path.join('output', f'top_{top_n}_box_office_movies_{FIRST_YEAR}_{LAST_YEAR}.csv')
+    df.to_csv(output_path, index=False)
+
+    print(f"Data scraping completed and saved to {output_path} ({len(partitions)} of {len(all_years)} years).")
+
+if __name__ == '__main__':
+    main([int(year) for year in sys.argv[1:]])
@@ -0,0 +1,2 @@
+# shared helpers for the scrapers in the three project folders
+# the scripts add the repository root to sys.path and import from here, e.g. `from scraping.async_fetch import fetch_many`
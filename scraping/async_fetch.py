@@ -0,0 +1,114 @@
+# concurrent page fetching for the scrapers: one pooled aiohttp session, a token-bucket rate limit,
+# bounded concurrency and retry with exponential backoff when the site answers 403/429 or a 5xx
+# pages go through the shared response cache (scraping/http_cache.py) unless use_cache=False
+import asyncio
+import random
+import time
+import aiohttp
+from scraping.http_cache import get_cache
+
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.5'
+}
+RETRY_STATUSES = {403, 429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    # allows `rate` requests per second on average with bursts of up to `burst` requests
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def retry_delay(response, attempt, backoff):
+    # honour Retry-After when the server sends seconds, otherwise exponential backoff with jitter
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return backoff * (2 ** attempt) * (0.5 + random.random())
+
+
+async def fetch_text(session, url, bucket, semaphore, retries=4, backoff=1.0, cache=None, entry=None):
+    # returns (status, text); status is None when every attempt failed on the connection itself
+    # `entry` is a stale cache entry to revalidate: a 304 answer hands back its body
+    status = None
+    conditional = cache.conditional_headers(entry) if cache is not None else {}
+    for attempt in range(retries + 1):
+        await bucket.acquire()
+        response = None
+        try:
+            async with semaphore:
+                async with session.get(url, headers=conditional) as response:
+                    status = response.status
+                    if status == 304 and entry is not None:
+                        cache.touch(url)
+                        return entry[0], entry[1].decode(entry[2] or 'utf-8', errors='replace')
+                    if status not in RETRY_STATUSES:
+                        content = await response.read()
+                        encoding = response.get_encoding()
+                        if cache is not None:
+                            cache.store(url, status, content, encoding, response.headers)
+                        return status, content.decode(encoding, errors='replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Request to {url} failed: {e}")
+        if attempt < retries:
+            delay = retry_delay(response, attempt, backoff)
+            print(f"Retrying {url} in {delay:.1f}s (status {status})...")
+            await asyncio.sleep(delay)
+    return status, None
+
+
+async def fetch_all(urls, rate=2.0, burst=2, concurrency=8, headers=None, retries=4, backoff=1.0, timeout=30,
+                    use_cache=True):
+    # fetches every url through one pooled session; the result maps url -> (status, text)
+    # fresh cache hits are answered without a request, and in replay mode misses come back as (None, None)
+    cache = get_cache() if use_cache else None
+    results = {}
+    stale = {}
+    if cache is not None:
+        for url in urls:
+            entry = cache.lookup(url)
+            if entry is not None and cache.is_fresh(entry):
+                results[url] = (entry[0], entry[1].decode(entry[2] or 'utf-8', errors='replace'))
+            elif cache.mode == 'replay':
+                print(f"Replay mode: {url} is not in the cache")
+                results[url] = (None, None)
+            else:
+                stale[url] = entry
+    urls = [url for url in urls if url not in results]
+    if not urls:
+        return results
+
+    bucket = TokenBucket(rate, burst)
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(headers=headers or DEFAULT_HEADERS, connector=connector,
+                                     timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        fetched = await asyncio.gather(*(fetch_text(session, url, bucket, semaphore, retries, backoff,
+                                                    cache, stale.get(url))
+                                         for url in urls))
+    results.update(zip(urls, fetched))
+    return results
+
+
+def fetch_many(urls, **kwargs):
+    # synchronous entry point for the scripts
+    urls = list(dict.fromkeys(urls))
+    if not urls:
+        return {}
+    return asyncio.run(fetch_all(urls, **kwargs))
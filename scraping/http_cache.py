@@ -0,0 +1,173 @@
+# shared on-disk response cache for the scrapers, so a re-run after a parse fix does not download everything again
+# responses live in one SQLite file: the urls table points at a content-addressed bodies table (sha1 of the body,
+# zlib-compressed), so pages that come back identical under different urls are stored once
+#
+# SCRAPE_CACHE_MODE picks how the cache is used:
+#   normal  - serve entries younger than the TTL, revalidate older ones with ETag/Last-Modified (default)
+#   replay  - serve only from the cache and never touch the network; a miss comes back as status None
+#   refresh - always go to the network and overwrite the cache
+#   off     - no cache at all
+# SCRAPE_CACHE_DIR moves the cache (default: .http_cache in the repository root),
+# SCRAPE_CACHE_TTL sets the TTL in seconds (default 7 days)
+import os
+import time
+import sqlite3
+import zlib
+import hashlib
+import threading
+import requests
+
+MODES = ('normal', 'replay', 'refresh', 'off')
+DEFAULT_TTL = 7 * 24 * 3600
+# only answers that will not change by asking again are worth keeping; 403/429/5xx are retried instead
+CACHEABLE_STATUSES = {200, 404, 410}
+CACHE_FILE = 'responses.sqlite'
+
+_default_cache = None
+
+
+def default_cache_dir():
+    return os.environ.get('SCRAPE_CACHE_DIR',
+                          os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.http_cache'))
+
+
+def cache_mode():
+    mode = os.environ.get('SCRAPE_CACHE_MODE', 'normal').lower()
+    if mode not in MODES:
+        raise ValueError(f"SCRAPE_CACHE_MODE must be one of {', '.join(MODES)}, not {mode!r}")
+    return mode
+
+
+class CachedResponse:
+    # the part of requests.Response the scrapers use, for answers that may come from the cache
+    def __init__(self, url, status_code, content, encoding='utf-8', from_cache=False):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        if self.content is None:
+            return None
+        return self.content.decode(self.encoding or 'utf-8', errors='replace')
+
+
+class HttpCache:
+    def __init__(self, cache_dir=None, ttl=None, mode=None):
+        self.mode = mode or cache_mode()
+        self.ttl = ttl if ttl is not None else float(os.environ.get('SCRAPE_CACHE_TTL', DEFAULT_TTL))
+        self.lock = threading.Lock()
+        self.db = None
+        if self.mode == 'off':
+            return
+        cache_dir = cache_dir or default_cache_dir()
+        os.makedirs(cache_dir, exist_ok=True)
+        # one connection shared by the threads of a scraper; writes are serialised with the lock
+        self.db = sqlite3.connect(os.path.join(cache_dir, CACHE_FILE), timeout=60, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('CREATE TABLE IF NOT EXISTS bodies (sha1 TEXT PRIMARY KEY, body BLOB)')
+        self.db.execute('CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, status INTEGER, sha1 TEXT, '
+                        'encoding TEXT, etag TEXT, last_modified TEXT, fetched_at REAL)')
+        self.db.commit()
+
+    def lookup(self, url):
+        # returns (status, body, encoding, etag, last_modified, fetched_at) or None
+        if self.db is None or self.mode == 'refresh':
+            return None
+        with self.lock:
+            row = self.db.execute('SELECT u.status, b.body, u.encoding, u.etag, u.last_modified, u.fetched_at '
+                                  'FROM urls u JOIN bodies b ON u.sha1 = b.sha1 WHERE u.url = ?', (url,)).fetchone()
+        if row is None:
+            return None
+        status, body, encoding, etag, last_modified, fetched_at = row
+        return status, zlib.decompress(body), encoding, etag, last_modified, fetched_at
+
+    def is_fresh(self, entry):
+        return self.mode == 'replay' or time.time() - entry[5] < self.ttl
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry is not None:
+            if entry[3]:
+                headers['If-None-Match'] = entry[3]
+            if entry[4]:
+                headers['If-Modified-Since'] = entry[4]
+        return headers
+
+    def store(self, url, status, content, encoding=None, headers=None):
+        if self.db is None or status not in CACHEABLE_STATUSES or content is None:
+            return
+        headers = headers or {}
+        sha1 = hashlib.sha1(content).hexdigest()
+        with self.lock:
+            self.db.execute('INSERT OR IGNORE INTO bodies VALUES (?, ?)', (sha1, zlib.compress(content, 6)))
+            self.db.execute('INSERT OR REPLACE INTO urls VALUES (?, ?, ?, ?, ?, ?, ?)',
+                            (url, status, sha1, encoding, headers.get('ETag'), headers.get('Last-Modified'),
+                             time.time()))
+            self.db.commit()
+
+    def touch(self, url):
+        # a 304 answer: the cached body is still good for another TTL
+        if self.db is None:
+            return
+        with self.lock:
+            self.db.execute('UPDATE urls SET fetched_at = ? WHERE url = ?', (time.time(), url))
+            self.db.commit()
+
+    def forget(self, url):
+        if self.db is None:
+            return
+        with self.lock:
+            self.db.execute('DELETE FROM urls WHERE url = ?', (url,))
+            self.db.commit()
+
+    def close(self):
+        if self.db is not None:
+            self.db.close()
+            self.db = None
+
+
+def get_cache():
+    # one cache per process, built from the environment the first time a scraper asks for it
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = HttpCache()
+    return _default_cache
+
+
+def cached_get(url, headers=None, timeout=30, cache=None, session=None, delay=0):
+    # drop-in for requests.get(url, headers=headers) in the scrapers; `delay` is the politeness pause,
+    # taken only before a real request so a re-run from the cache does not wait at all
+    cache = cache or get_cache()
+    entry = cache.lookup(url)
+    if entry is not None and cache.is_fresh(entry):
+        return CachedResponse(url, entry[0], entry[1], entry[2], from_cache=True)
+    if cache.mode == 'replay':
+        print(f"Replay mode: {url} is not in the cache")
+        return CachedResponse(url, None, None)
+
+    time.sleep(delay)
+    request_headers = dict(headers or {})
+    request_headers.update(cache.conditional_headers(entry))
+    response = (session or requests).get(url, headers=request_headers, timeout=timeout)
+    if response.status_code == 304 and entry is not None:
+        cache.touch(url)
+        return CachedResponse(url, entry[0], entry[1], entry[2], from_cache=True)
+    cache.store(url, response.status_code, response.content, response.encoding, response.headers)
+    return CachedResponse(url, response.status_code, response.content, response.encoding)
+
+
+def cached_render(url, render, cache=None):
+    # for pages that need a browser: render(url) returns the page source and is only called on a miss
+    cache = cache or get_cache()
+    entry = cache.lookup(url)
+    if entry is not None and cache.is_fresh(entry):
+        return entry[1].decode(entry[2] or 'utf-8', errors='replace')
+    if cache.mode == 'replay':
+        print(f"Replay mode: {url} is not in the cache")
+        return None
+    html = render(url)
+    cache.store(url, 200, html.encode('utf-8'), 'utf-8')
+    return html
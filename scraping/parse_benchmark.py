@@ -0,0 +1,135 @@
+# benchmark for the scrapers' extraction functions: runs every parse_* function over saved pages with each
+# installed parser backend, reports pages/second and checks that every backend extracts the same data
+# pages come from the shared response cache by default (whatever the scrapers have downloaded so far), or from
+# a fixtures folder with one sub-folder of .html files per extractor:
+#   python -m scraping.parse_benchmark [--fixtures DIR] [--repeat N] [--backends lxml html.parser]
+import os
+import re
+import sys
+import time
+import argparse
+import importlib.util
+from scraping.parsers import available_backends, set_parser
+from scraping.http_cache import get_cache
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+YBS_SCRAPER = os.path.join('1- Baby Names', 'YBS_scraper1.1release.py')
+AWARDS_SCRAPER = os.path.join('2- Director Star Connection', 'Director_actor_relation_p2b.py')
+VILLAINS_SCRAPER = os.path.join('3-Villians Heatmap', 'villians_data_scraper.py')
+BOX_OFFICE_SCRAPER = os.path.join('3-Villians Heatmap', 'villians_data_scraper_imdb.py')
+ORIGIN_SCRAPER = os.path.join('3-Villians Heatmap', 'find_villains_origin.py')
+TOP_CHART_SCRAPER = os.path.join('3-Villians Heatmap', 'imdb_scraper_general.py')
+
+# name, script, function, url pattern of its pages in the cache, how to call it on (html, url)
+EXTRACTORS = [
+    ('tv_show_links', YBS_SCRAPER, 'parse_tv_show_links', r'/search/title/', lambda f, html, url: f(html)),
+    ('tv_show_info', YBS_SCRAPER, 'parse_tv_show_info', r'/title/tt\d+/?(\?|$)', lambda f, html, url: f(html)),
+    ('full_cast', YBS_SCRAPER, 'parse_full_cast', r'/title/tt\d+/fullcredits', lambda f, html, url: f(html)),
+    ('imdb_awards', AWARDS_SCRAPER, 'parse_imdb_awards', r'/name/nm\d+/awards', lambda f, html, url: f(html, '')),
+    ('villain_links', VILLAINS_SCRAPER, 'parse_villain_links', r'superherodb\.com/characters/',
+     lambda f, html, url: f(html)),
+    ('villain_details', VILLAINS_SCRAPER, 'parse_villain_details', r'superherodb\.com/(?!characters/)',
+     lambda f, html, url: f(html, url)),
+    ('box_office_top', BOX_OFFICE_SCRAPER, 'parse_top_movies', r'boxofficemojo\.com/year/',
+     lambda f, html, url: f(html, 0)),
+    ('wiki_origin', ORIGIN_SCRAPER, 'parse_origin', r'(fandom\.com|wikipedia\.org)/wiki/', lambda f, html, url: f(html)),
+    ('imdb_top_chart', TOP_CHART_SCRAPER, 'parse_top_chart', r'imdb\.com/chart/top', lambda f, html, url: f(html)),
+]
+
+_modules = {}
+
+
+def load_script(script):
+    # the scripts live in folders with spaces in their names, so they are loaded from their path
+    if script not in _modules:
+        path = os.path.join(REPO_ROOT, script)
+        spec = importlib.util.spec_from_file_location(re.sub(r'\W', '_', script), path)
+        module = importlib.util.module_from_spec(spec)
+        sys.path.insert(0, os.path.dirname(path))
+        try:
+            spec.loader.exec_module(module)
+        finally:
+            sys.path.remove(os.path.dirname(path))
+        _modules[script] = module
+    return _modules[script]
+
+
+def pages_from_cache(pattern):
+    cache = get_cache()
+    if cache.db is None:
+        return []
+    with cache.lock:
+        urls = [url for (url,) in cache.db.execute('SELECT url FROM urls WHERE status = 200')]
+    pages = []
+    for url in urls:
+        if re.search(pattern, url):
+            status, body, encoding, _, _, _ = cache.lookup(url)
+            pages.append((url, body.decode(encoding or 'utf-8', errors='replace')))
+    return pages
+
+
+def pages_from_folder(folder):
+    pages = []
+    if os.path.isdir(folder):
+        for file_name in sorted(os.listdir(folder)):
+            if file_name.endswith('.html'):
+                with open(os.path.join(folder, file_name), 'r', encoding='utf-8') as f:
+                    pages.append((file_name, f.read()))
+    return pages
+
+
+def run_extractor(call, function, pages):
+    results = []
+    for url, html in pages:
+        try:
+            results.append(call(function, html, url))
+        except Exception as e:
+            results.append(f"{type(e).__name__}: {e}")
+    return results
+
+
+def benchmark(fixtures=None, backends=None, repeat=3):
+    backends = backends or available_backends()
+    rows = []
+    for name, script, function_name, pattern, call in EXTRACTORS:
+        pages = pages_from_folder(os.path.join(fixtures, name)) if fixtures else pages_from_cache(pattern)
+        if not pages:
+            print(f"{name}: no saved pages, skipped")
+            continue
+        try:
+            function = getattr(load_script(script), function_name)
+        except ImportError as e:
+            print(f"{name}: {script} cannot be imported here ({e}), skipped")
+            continue
+
+        reference = None
+        for backend in backends:
+            set_parser(backend)
+            results = run_extractor(call, function, pages)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                run_extractor(call, function, pages)
+            elapsed = time.perf_counter() - start
+            if reference is None:
+                reference = results
+            # pages whose extracted data differs from the first backend's
+            mismatches = sum(a != b for a, b in zip(results, reference))
+            rows.append((name, backend, len(pages), len(pages) * repeat / elapsed, mismatches))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the scrapers' extraction functions per parser backend")
+    parser.add_argument('--fixtures', help='folder with one sub-folder of saved .html pages per extractor')
+    parser.add_argument('--backends', nargs='+', help=f"backends to compare (installed: {', '.join(available_backends())})")
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    rows = benchmark(args.fixtures, args.backends, args.repeat)
+    print(f"{'extractor':<18}{'backend':<14}{'pages':>7}{'pages/s':>12}{'mismatches':>12}")
+    for name, backend, n_pages, rate, mismatches in rows:
+        print(f"{name:<18}{backend:<14}{n_pages:>7}{rate:>12.1f}{mismatches:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+# one place that decides which tree builder BeautifulSoup uses, so every scraper can switch to a faster backend
+# the extraction code stays the same: all backends build a bs4 tree, only the parsing underneath changes
+# SCRAPE_PARSER (or set_parser) picks the backend; the default stays the built-in html.parser, so switching to lxml
+# is a choice made after parse_benchmark.py shows the extractors agree on it
+import os
+from bs4 import BeautifulSoup, FeatureNotFound
+
+# lxml is the fastest, html.parser ships with Python so it is always there, html5lib is the slowest but the
+# most lenient
+BACKENDS = ('lxml', 'html.parser', 'html5lib')
+DEFAULT_BACKEND = 'html.parser'
+
+_parser = None
+
+
+def available_backends():
+    backends = []
+    for backend in BACKENDS:
+        try:
+            BeautifulSoup('<p></p>', backend)
+        except FeatureNotFound:
+            continue
+        backends.append(backend)
+    return backends
+
+
+def set_parser(backend):
+    global _parser
+    if backend not in available_backends():
+        raise ValueError(f"parser backend {backend!r} is not installed (available: {', '.join(available_backends())})")
+    _parser = backend
+
+
+def get_parser():
+    if _parser is None:
+        set_parser(os.environ.get('SCRAPE_PARSER') or DEFAULT_BACKEND)
+    return _parser
+
+
+def make_soup(html, parse_only=None):
+    # parse_only takes a bs4 SoupStrainer, to build just the part of the page an extractor reads
+    return BeautifulSoup(html, get_parser(), parse_only=parse_only)
@@ -0,0 +1,69 @@
+# local stub HTTP server that serves saved pages, so the scrapers can be run without touching the real sites
+# pages are stored one file per url path+query (see page_file_name); run with
+#   python -m scraping.stub_server <pages_dir> [port]
+# and point the scraper's base url at http://127.0.0.1:<port>
+import os
+import sys
+import threading
+from urllib.parse import quote, urlsplit
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def page_file_name(url):
+    parts = urlsplit(url)
+    path = parts.path + ('?' + parts.query if parts.query else '')
+    return quote(path, safe='') + '.html'
+
+
+def save_page(pages_dir, url, html):
+    os.makedirs(pages_dir, exist_ok=True)
+    with open(os.path.join(pages_dir, page_file_name(url)), 'w', encoding='utf-8') as f:
+        f.write(html)
+
+
+def make_handler(pages_dir, fail_first=0):
+    # fail_first answers the first N requests for every page with 429, to exercise the retry path
+    failures = {}
+    lock = threading.Lock()
+
+    class StubHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                failures[self.path] = failures.get(self.path, 0) + 1
+                throttled = failures[self.path] <= fail_first
+            if throttled:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.end_headers()
+                return
+            file_path = os.path.join(pages_dir, page_file_name(self.path))
+            if not os.path.exists(file_path):
+                self.send_response(404)
+                self.end_headers()
+                return
+            with open(file_path, 'rb') as f:
+                body = f.read()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_server(pages_dir, port=0, fail_first=0):
+    # starts in a background thread and returns (server, base_url); call server.shutdown() when done
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(pages_dir, fail_first))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    server = ThreadingHTTPServer(('127.0.0.1', int(sys.argv[2]) if len(sys.argv) > 2 else 8000),
+                                 make_handler(sys.argv[1]))
+    print(f"Serving {sys.argv[1]} on http://127.0.0.1:{server.server_address[1]}")
+    server.serve_forever()
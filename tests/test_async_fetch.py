@@ -0,0 +1,36 @@
+import os
+import sys
+import time
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping.async_fetch import fetch_many
+from scraping.stub_server import save_page, start_stub_server
+
+PAGES = 5
+
+
+@pytest.fixture
+def stub(tmp_path):
+    # every page answers 429 once before it is served
+    for n in range(PAGES):
+        save_page(str(tmp_path), f'/title/tt{n}/', f'<html>show {n}</html>')
+    server, base_url = start_stub_server(str(tmp_path), fail_first=1)
+    yield [f'{base_url}/title/tt{n}/' for n in range(PAGES)]
+    server.shutdown()
+    server.server_close()
+
+
+def test_fetch_many_retries_and_rate_limits(stub):
+    rate, burst = 20.0, 2
+    began = time.monotonic()
+    pages = fetch_many(stub, rate=rate, burst=burst, concurrency=4, backoff=0.01, use_cache=False)
+    elapsed = time.monotonic() - began
+    assert [pages[url] for url in stub] == [(200, f'<html>show {n}</html>') for n in range(PAGES)]
+    # each page took two requests (the 429 and its retry); past the burst they are spaced 1/rate apart
+    assert elapsed >= (2 * PAGES - burst) / rate * 0.95
+
+
+def test_fetch_many_gives_up_after_retries(stub):
+    pages = fetch_many(stub[:1], rate=100.0, retries=0, use_cache=False)
+    assert pages[stub[0]] == (429, None)
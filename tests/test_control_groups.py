@@ -0,0 +1,32 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1- Baby Names'))
+from name_store import load_name_store
+from control_groups import matched_pool, year_jumps
+
+
+def make_store(tmp_path):
+    folder = tmp_path / 'names_extracted'
+    folder.mkdir()
+    for year, rows in [(2000, 'Emma,F,50\nNoah,M,40\n'), (2001, 'Arya,F,5\nEmma,F,45\nNoah,M,42\n'),
+                       (2002, 'Arya,F,10\nNoah,M,30\n')]:
+        (folder / f'yob{year}.txt').write_text(rows)
+    return load_name_store(str(folder), 2000, 2002, use_cache=False)
+
+
+def test_year_jumps_outside_the_store(tmp_path):
+    store = make_store(tmp_path)
+    debut_counts, jumps = year_jumps(store, 2001)
+    assert debut_counts[store.name_id('Arya')] == 5
+    assert jumps[store.name_id('Arya')] == 100
+    # before the first year, and the last year (no year after it to measure a jump on)
+    for year in (1999, 2002, 2010):
+        assert year_jumps(store, year) == (None, None)
+
+
+def test_matched_pool_without_candidates():
+    assert len(matched_pool(np.zeros(4), 5, 0, 0.25, 2)) == 0
+    assert matched_pool(np.array([5, 0, 100, 0]), 5, 0, 0.25, 2).tolist() == [2]
+    assert sorted(matched_pool(np.array([5, 6, 100, 1000]), 5, 0, 0.25, 2).tolist()) == [1, 2]
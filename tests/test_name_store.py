@@ -0,0 +1,50 @@
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1- Baby Names'))
+from name_store import LazyNameStore, load_name_store, read_manifest
+
+
+def write_yob(folder, year, rows):
+    with open(os.path.join(folder, f'yob{year}.txt'), 'w') as f:
+        f.writelines(f'{name},{gender},{count}\n' for name, gender, count in rows)
+
+
+def make_corpus(tmp_path):
+    folder = tmp_path / 'names_extracted'
+    folder.mkdir()
+    write_yob(folder, 2000, [('Emma', 'F', 50), ('Noah', 'M', 40)])
+    write_yob(folder, 2001, [('Arya', 'F', 5), ('Emma', 'F', 45), ('Noah', 'M', 42)])
+    write_yob(folder, 2002, [('Arya', 'F', 9), ('Arya', 'M', 1), ('Noah', 'M', 30)])
+    return str(folder)
+
+
+def test_lazy_store_without_cache(tmp_path):
+    folder = make_corpus(tmp_path)
+    store = LazyNameStore(folder, 2000, 2002, use_cache=False)
+    assert store.name_id('Arya') is not None
+    assert store.name_id('Zelda') is None
+    assert list(store.names) == ['Arya', 'Emma', 'Noah']
+    assert store.get_counts_many(['Arya', 'Zelda'], 2000, 2002).tolist() == [[0, 5, 10], [0, 0, 0]]
+    assert not os.path.exists(tmp_path / 'names_cache')
+
+
+def test_lazy_store_builds_then_appends_cache(tmp_path, capsys):
+    folder = make_corpus(tmp_path)
+    os.remove(os.path.join(folder, 'yob2002.txt'))
+    store = LazyNameStore(folder, 2000, 2002)
+    assert read_manifest(str(tmp_path / 'names_cache'))['last_year'] == 2001
+    assert store.get_counts_many(['Arya'], 2000, 2002).tolist() == [[0, 5, 0]]
+
+    # a new year after the cached range goes through append_year, not a rebuild
+    write_yob(folder, 2002, [('Arya', 'F', 9), ('Arya', 'M', 1), ('Noah', 'M', 30), ('Zelda', 'F', 7)])
+    capsys.readouterr()
+    store = LazyNameStore(folder, 2000, 2002)
+    assert 'Appending yob2002.txt' in capsys.readouterr().out
+    assert read_manifest(str(tmp_path / 'names_cache'))['last_year'] == 2002
+    assert store.name_id('Zelda') is not None
+    assert store.get_counts_many(['Arya', 'Zelda'], 2000, 2002).tolist() == [[0, 5, 10], [0, 0, 7]]
+    full = load_name_store(folder, 2000, 2002, use_cache=False)
+    assert np.array_equal(store.get_counts_many(['Emma', 'Noah'], 2000, 2002),
+                          full.get_counts_many(['Emma', 'Noah'], 2000, 2002))
@@ -0,0 +1,54 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1- Baby Names'))
+from name_store import LazyNameStore
+from name_summary import load_name_summary
+from name_variants import load_variant_index
+
+
+def make_corpus(tmp_path):
+    folder = tmp_path / 'names_extracted'
+    folder.mkdir()
+    for year, rows in [(2000, 'Emma,F,50\nNoah,M,40\n'), (2001, 'Arya,F,5\nEmma,F,45\nNoah,M,42\n'),
+                       (2002, 'Arya,F,9\nArya,M,1\nNoah,M,30\n')]:
+        (folder / f'yob{year}.txt').write_text(rows)
+    return str(folder)
+
+
+def test_summary_lookups(tmp_path):
+    summary = load_name_summary(make_corpus(tmp_path))
+    assert summary.top_k(2001, 2, 'F')['name'].tolist() == ['Emma', 'Arya']
+    assert summary.rank(['Arya', 'Emma', 'Zelda'], 2002, 'F').tolist() == [1, 0, 0]
+    assert summary.zero_at_debut(['Arya', 'Emma'], 2000).tolist() == [True, False]
+    assert summary.given_between(['Arya', 'Emma'], 2000, 2001, 'F').tolist() == [False, True]
+
+
+@pytest.mark.parametrize('year', [1870, 1999, 2003])
+def test_year_outside_the_summary(tmp_path, year):
+    summary = load_name_summary(make_corpus(tmp_path))
+    for lookup in (lambda: summary.top_k(year, 3, 'F'), lambda: summary.rank(['Emma'], year, 'F'),
+                   lambda: summary.share(['Emma'], year), lambda: summary.zero_at_debut(['Emma'], year)):
+        with pytest.raises(ValueError):
+            lookup()
+
+
+def test_summary_over_a_lazy_store(tmp_path):
+    folder = make_corpus(tmp_path)
+    store = LazyNameStore(folder, 2001, 2002)
+    summary = load_name_summary(folder, store=store)
+    assert summary.zero_at_debut(['Arya', 'Emma', 'Zelda'], 2002).tolist() == [False, True, True]
+    assert store.touched_summary() == '2002'
+    assert summary.top_k(2002, 1, 'M')['count'].tolist() == [30]
+
+
+def test_zero_at_debut_over_spelling_variants(tmp_path):
+    folder = tmp_path / 'names_extracted'
+    folder.mkdir()
+    (folder / 'yob2000.txt').write_text('Aria,F,4\nEmma,F,50\n')
+    (folder / 'yob2001.txt').write_text('Arya,F,5\nAria,F,6\n')
+    summary = load_name_summary(str(folder))
+    index = load_variant_index(str(folder))
+    assert summary.zero_at_debut(['Arya', 'Emma'], 2000).tolist() == [True, False]
+    assert summary.zero_at_debut(['Arya', 'Emma'], 2000, variant_index=index).tolist() == [False, False]
@@ -0,0 +1,47 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1- Baby Names'))
+from name_variants import build_variant_index, load_variant_index
+
+VOCABULARY = ['Aara', 'Arah', 'Ara', 'Araya', 'Aria', 'Arra', 'Arya', 'Daenerys', 'Danerys', 'Elie', 'Ellie', 'Jaan',
+              'Jahn', 'Jan', 'Jean', 'Jeon', 'Jhon', 'Jion', 'Joan', 'Joann', 'John', 'Jon', 'Rose', 'Ross']
+
+
+@pytest.fixture(scope='module')
+def index():
+    return build_variant_index(sorted(VOCABULARY))
+
+
+@pytest.mark.parametrize('a, b', [('Rose', 'Ross'), ('Joan', 'Jon'), ('Jon', 'Jeon'), ('Jon', 'Jion'),
+                                  ('Joan', 'Jan'), ('Joan', 'Jahn'), ('Joan', 'Jaan'), ('Jean', 'Jon'),
+                                  ('Arya', 'Ara'), ('Arya', 'Aara'), ('Arya', 'Arah'), ('Arya', 'Arra'),
+                                  ('Arya', 'Araya')])
+def test_distinct_names_stay_apart(index, a, b):
+    assert b not in index.variants(a)
+    assert a not in index.variants(b)
+
+
+@pytest.mark.parametrize('a, b', [('Daenerys', 'Danerys'), ('Jon', 'John'), ('Jon', 'Jhon'), ('Arya', 'Aria'),
+                                  ('Ellie', 'Elie'), ('Joan', 'Joann')])
+def test_spelling_variants_are_grouped(index, a, b):
+    assert b in index.variants(a)
+    assert a in index.variants(b)
+
+
+def test_cached_index_follows_the_vocabulary(tmp_path, capsys):
+    folder = tmp_path / 'names_extracted'
+    folder.mkdir()
+    (folder / 'yob2000.txt').write_text('Arya,F,5\nAria,F,7\nJon,M,3\n')
+    assert load_variant_index(str(folder)).variants('Arya') == ['Aria', 'Arya']
+    capsys.readouterr()
+    assert load_variant_index(str(folder)).variants('Arya') == ['Aria', 'Arya']
+    assert 'Building spelling-variant index' not in capsys.readouterr().out
+
+    # a corrected file with as many names: the name ids move, so the cached index must not be reused
+    (folder / 'yob2000.txt').write_text('Arya,F,5\nAria,F,7\nJohn,M,3\n')
+    index = load_variant_index(str(folder))
+    assert 'Building spelling-variant index' in capsys.readouterr().out
+    assert index.variants('Jon') == ['Jon']
+    assert index.variants('John') == ['John']
@@ -0,0 +1,26 @@
+import os
+import sys
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from scraping import parsers
+
+
+@pytest.fixture(autouse=True)
+def fresh_parser(monkeypatch):
+    monkeypatch.setattr(parsers, '_parser', None)
+
+
+def test_default_is_html_parser(monkeypatch):
+    monkeypatch.delenv('SCRAPE_PARSER', raising=False)
+    assert parsers.get_parser() == 'html.parser'
+
+
+def test_backend_from_the_environment(monkeypatch):
+    backend = parsers.available_backends()[-1]
+    monkeypatch.setenv('SCRAPE_PARSER', backend)
+    assert parsers.get_parser() == backend
+    monkeypatch.setenv('SCRAPE_PARSER', 'no-such-parser')
+    monkeypatch.setattr(parsers, '_parser', None)
+    with pytest.raises(ValueError):
+        parsers.get_parser()
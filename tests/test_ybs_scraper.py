@@ -0,0 +1,45 @@
+import os
+import importlib.util
+import pytest
+
+SCRAPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '1- Baby Names', 'YBS_scraper1.1release.py')
+
+
+@pytest.fixture
+def scraper():
+    spec = importlib.util.spec_from_file_location('ybs_scraper', SCRAPER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.num_of_shows = None
+    return module
+
+
+def search_page(first, count):
+    return ''.join(f'<a class="ipc-title-link-wrapper" href="/title/tt{n}/">{n}</a>' for n in range(first, first + count))
+
+
+def test_pagination_stops_when_start_is_ignored(scraper):
+    # every results page is the same 50 shows
+    fetched = []
+
+    def fetch_pages(urls):
+        fetched.extend(urls)
+        return {url: (200, search_page(0, scraper.PAGE_SIZE)) for url in urls}
+
+    scraper.fetch_pages = fetch_pages
+    links = scraper.get_tv_show_links_async()
+    assert len(links) == scraper.PAGE_SIZE
+    assert len(fetched) == scraper.MAX_CONCURRENCY
+
+
+def test_pagination_runs_to_the_short_page(scraper):
+    def fetch_pages(urls):
+        pages = {}
+        for url in urls:
+            first = int(url.split('start=')[1].split('&')[0]) - 1
+            pages[url] = (200, search_page(first, min(scraper.PAGE_SIZE, 420 - first)))
+        return pages
+
+    scraper.fetch_pages = fetch_pages
+    links = scraper.get_tv_show_links_async()
+    assert len(links) == 420 == len(set(links))